@@ -5,13 +5,20 @@ A Python GUI application that generates comprehensive book marketing content usi
 
 import os
 import sys
+import asyncio
 import threading
+import queue
+import hashlib
+import json
+import re
+import sqlite3
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from typing import Any
 import time
+import random
 
 try:
     import google.generativeai as _genai  # type: ignore
@@ -21,6 +28,12 @@ except Exception:
 # Expose `genai` as `Any` so static type checkers don't error on attribute access.
 genai: Any = _genai
 
+# Optional: PDF text extraction
+try:
+    from pypdf import PdfReader  # type: ignore
+except Exception:
+    PdfReader = None  # type: ignore
+
 
 class ModelCallError(Exception):
     """Raised when the model call fails in a way that may be retried or reported."""
@@ -50,6 +63,9 @@ MARKETING_PROMPTS = [
     "Provide a brief Final Sensitivity Review. Identify the book's core sensitive themes (e.g., trauma, grief, addiction). Then, provide a statement (1-2 sentences) confirming that the marketing approach focuses on resilience and healing/resolution and avoids exploitation or sensationalism."
 ]
 
+# UTF-8 encodings of the prompts, computed once for cache-key hashing
+MARKETING_PROMPTS_BYTES = tuple(p.encode("utf-8") for p in MARKETING_PROMPTS)
+
 GEMINI_MODELS = [
     "gemini-2.5-pro",
     "gemini-2.5-flash",
@@ -60,6 +76,301 @@ GEMINI_MODELS = [
     "gemini-1.5-flash",
 ]
 
+# Concurrent in-flight prompt requests per book. Pro models have a much lower requests-per-minute
+# quota, so keep their pool small to avoid tripping 429s.
+MODEL_MAX_WORKERS = {
+    "gemini-2.5-pro": 2,
+    "gemini-1.5-pro": 2,
+}
+DEFAULT_MAX_WORKERS = 8
+
+# Per-model quotas as (requests per minute, tokens per minute). Requests are paced
+# against these up front so we rarely see a 429 in the first place. The defaults are
+# the free-tier quotas; paid projects can raise them with GEMINI_RATE_LIMITS (see
+# _load_rate_limits). Each quota is a TokenBucket that refills lazily from the
+# elapsed time whenever a caller asks for tokens, rather than from a background
+# replenisher thread, so there is nothing to start or stop between runs.
+RATE_LIMITS = {
+    "gemini-2.5-pro": (2, 32_000),
+    "gemini-2.5-flash": (15, 1_000_000),
+    "gemini-2.5-flash-lite": (15, 1_000_000),
+    "gemini-2.0-flash": (15, 1_000_000),
+    "gemini-2.0-flash-lite": (30, 1_000_000),
+    "gemini-1.5-pro": (2, 32_000),
+    "gemini-1.5-flash": (15, 1_000_000),
+}
+DEFAULT_RATE_LIMIT = (15, 1_000_000)
+
+
+def _load_rate_limits():
+    """Apply overrides from the GEMINI_RATE_LIMITS environment variable.
+
+    The value is a JSON object mapping a model name (or "default") to
+    [requests per minute, tokens per minute], e.g.
+    '{"gemini-2.5-pro": [150, 2000000], "default": [1000, 4000000]}'.
+
+    Returns an error message if the value is invalid (the built-in quotas are
+    kept), otherwise None.
+    """
+    global DEFAULT_RATE_LIMIT
+    raw = os.environ.get("GEMINI_RATE_LIMITS", "").strip()
+    if not raw:
+        return None
+    try:
+        overrides = {name: (float(rpm), float(tpm)) for name, (rpm, tpm) in json.loads(raw).items()}
+        if any(v <= 0 for limit in overrides.values() for v in limit):
+            raise ValueError("limits must be positive")
+    except (ValueError, TypeError, AttributeError) as e:
+        return f"Ignoring GEMINI_RATE_LIMITS ({e}); using the built-in quotas"
+    DEFAULT_RATE_LIMIT = overrides.pop("default", DEFAULT_RATE_LIMIT)
+    RATE_LIMITS.update(overrides)
+    return None
+
+
+# Reported in the app's log once the window is up
+_RATE_LIMITS_ERROR = _load_rate_limits()
+
+# Book file types read_book_content can handle
+_VALID_SUFFIXES = frozenset({".txt", ".md", ".pdf"})
+
+# Only the start of each book is sent to the model to stay within token limits
+MAX_BOOK_CHARS = 100_000
+
+SYSTEM_HEADER = "You are a professional book marketing expert. Based on the following book content, complete each task you are given."
+
+# Groups of MARKETING_PROMPTS indices that can share one request when prompt bundling
+# is enabled. Related, mostly short-answer tasks are grouped; the long-form ones
+# (post ideas, ads) run alone so they don't crowd each other out of the output budget.
+PROMPT_BUNDLES = [
+    [0, 1, 2, 3, 4],          # genre, audience, tropes, logline, synopsis
+    [5, 6],                   # blurbs and picking the best one
+    [7, 8, 9, 10, 11, 12],    # taglines, keywords, categories, codes, subtitles
+    [13],                     # selling points
+    [14, 15],                 # social strategy and things to avoid
+    [16],                     # post ideas
+    [17],                     # ads
+    [18, 19],                 # excerpts and sensitivity review
+]
+
+BUNDLE_INSTRUCTIONS = (
+    "Complete each of the following tasks. Return a JSON object with keys "
+    "'task_1' through 'task_{count}', where each value is a Markdown-formatted "
+    "string answering the corresponding task.\n\n"
+)
+
+# Error messages that indicate a transient failure worth retrying
+_RETRYABLE_RE = re.compile(r"429|resource has been exhausted|quota|rate[ -]?limit|timeout|temporar", re.I)
+
+# Upper bound (seconds) for the exponential retry backoff
+MAX_RETRY_DELAY = 60
+
+# Output tokens reserved per request when estimating token usage for the limiter
+OUTPUT_TOKEN_BUDGET = 2048
+
+
+# Responses are cached on disk so re-running the same book doesn't repeat API calls
+CACHE_DIR = Path.home() / ".cache" / "book_marketing"
+
+
+class ResponseCache:
+    """SQLite-backed cache of model responses, safe to share between worker threads."""
+
+    def __init__(self, db_path):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT, ts INTEGER)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name, prompt, content_hash):
+        """Key a response by model, task prompt, and a digest of the book content.
+
+        `prompt` may be a str or its pre-encoded UTF-8 bytes.
+        """
+        if isinstance(prompt, str):
+            prompt = prompt.encode("utf-8")
+        h = hashlib.sha256(model_name.encode("utf-8"))
+        h.update(b"\0")
+        h.update(prompt)
+        h.update(content_hash)
+        return h.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, response):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, ts) VALUES (?, ?, ?)",
+                (key, response, int(time.time())),
+            )
+            self._conn.commit()
+
+
+class TokenBucket:
+    """Thread-safe token bucket. Tokens refill continuously at `refill_rate` per second."""
+
+    def __init__(self, capacity, refill_rate):
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_consume(self, amount):
+        """Take `amount` tokens if available. Returns 0 on success, otherwise the seconds to wait."""
+        # A request larger than the whole bucket could never be satisfied; cap it
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.refill_rate)
+            self._last = now
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.refill_rate
+
+    def consume(self, amount=1, should_stop=None):
+        """Block until `amount` tokens are available.
+
+        Returns False if `should_stop()` becomes true while waiting.
+        """
+        while True:
+            wait = self.try_consume(amount)
+            if wait <= 0:
+                return True
+            if should_stop is not None and should_stop():
+                return False
+            # Sleep in short slices so cancellation stays responsive
+            time.sleep(min(wait, 0.5))
+
+    async def consume_async(self, amount=1, should_stop=None):
+        """Like consume, but waits with asyncio.sleep so the event loop keeps running."""
+        while True:
+            wait = self.try_consume(amount)
+            if wait <= 0:
+                return True
+            if should_stop is not None and should_stop():
+                return False
+            await asyncio.sleep(min(wait, 0.5))
+
+
+class RateLimiter:
+    """Paces model calls under a requests-per-minute and tokens-per-minute quota."""
+
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm, rpm / 60.0)
+        self.tokens = TokenBucket(tpm, tpm / 60.0)
+
+    def acquire(self, estimated_tokens, should_stop=None):
+        """Block until one request and `estimated_tokens` tokens fit under the quota."""
+        return (self.requests.consume(1, should_stop)
+                and self.tokens.consume(estimated_tokens, should_stop))
+
+    async def acquire_async(self, estimated_tokens, should_stop=None):
+        """Async version of acquire for use on the processing event loop."""
+        return (await self.requests.consume_async(1, should_stop)
+                and await self.tokens.consume_async(estimated_tokens, should_stop))
+
+REPORT_FOOTER = """## 💡 Note on File Format
+
+This report is in **Markdown (.md)** format. You can open it with any text editor or word processor. For a formatted Word document, open the file and then use 'File > Save As' to save it as a '.docx' file. The headings, bold text, and lists will be preserved!
+"""
+
+# Matches one prompt section of a report written by report_section
+_REPORT_SECTION_RE = re.compile(
+    r"^## (\d+)\. Prompt \1\n\n\*\*Task:\*\* .*?\n\n### Response:\n\n(.*?)\n\n---\n\n(?=## \d+\. Prompt \d+\n|\Z)",
+    re.S | re.M,
+)
+
+
+def content_marker(content_hash):
+    """Hidden report line tying the sections to the exact book text they answer."""
+    return f"<!-- content-sha256: {content_hash.hex()} -->\n"
+
+
+def report_header(book_name, model_name, content_hash=None):
+    marker = content_marker(content_hash) if content_hash is not None else ""
+    return f"""# 📚 Gemini Pro Book Marketing Content Report
+
+**Book:** {book_name}  
+**Generated:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}  
+**Model:** {model_name}
+{marker}
+---
+
+"""
+
+
+def report_section(prompt_num, prompt, result):
+    return f"""## {prompt_num}. Prompt {prompt_num}
+
+**Task:** {prompt}
+
+### Response:
+
+{result}
+
+---
+
+"""
+
+
+def load_partial_report(report_path, model_name, content_hash):
+    """Return {prompt_num: response} from an interrupted report, to resume from.
+
+    Only reports written incrementally by an earlier, cancelled run with the
+    same model and the same book text (content_hash) count; a finished report
+    (it ends with the footer), one written before the book was edited, or a
+    missing or unreadable file yields an empty dict.
+    """
+    try:
+        text = Path(report_path).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return {}
+    if REPORT_FOOTER in text or f"**Model:** {model_name}\n" not in text or content_marker(content_hash) not in text:
+        return {}
+    return {
+        int(m.group(1)): m.group(2)
+        for m in _REPORT_SECTION_RE.finditer(text)
+        if 1 <= int(m.group(1)) <= len(MARKETING_PROMPTS)
+    }
+
+
+def extract_pdf_text(file_path, max_chars):
+    """Extract up to `max_chars` of text from a PDF, stopping at the first page past the limit."""
+    if PdfReader is None:
+        raise RuntimeError("PDF support requires the 'pypdf' package. Install with: pip install pypdf")
+    reader = PdfReader(file_path)
+    parts = []
+    total = 0
+    for page in reader.pages:
+        text = page.extract_text() or ""
+        parts.append(text)
+        total += len(text)
+        if total >= max_chars:
+            break
+    return "\n".join(parts)[:max_chars]
+
+
+def read_book_content(file_path, max_chars):
+    """Read at most `max_chars` characters of a book file; only the start is ever sent."""
+    if Path(file_path).suffix.lower() == ".pdf":
+        return extract_pdf_text(file_path, max_chars)
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read(max_chars)
+    except UnicodeDecodeError:
+        with open(file_path, "r", encoding="latin-1") as f:
+            return f.read(max_chars)
+
+
 class BookMarketingGenerator:
     def __init__(self, root):
         self.root = root
@@ -68,13 +379,24 @@ class BookMarketingGenerator:
         self.root.minsize(700, 600)
         
         self.selected_files = []
+        # Mirrors selected_files for constant-time duplicate checks
+        self._selected_set: set[str] = set()
         self.output_path = tk.StringVar()
         self.api_key = tk.StringVar(value=os.environ.get("GOOGLE_API_KEY", ""))
         self.selected_model = tk.StringVar(value=GEMINI_MODELS[0])
         self.is_running = False
         self.cancel_requested = False
+        self.rate_limiter = None
+        self.response_cache = None
+        self.force_refresh = tk.BooleanVar(value=False)
+        self.bundle_prompts = tk.BooleanVar(value=False)
+        # Log lines from any thread; drained into the Tk widget on the main loop
+        self._log_queue: queue.Queue = queue.Queue()
         
         self.create_widgets()
+        self.root.after(100, self._drain_log)
+        if _RATE_LIMITS_ERROR:
+            self.log(f"⚠️ {_RATE_LIMITS_ERROR}")
         
     def create_widgets(self):
         main_frame = ttk.Frame(self.root, padding="10")
@@ -106,6 +428,12 @@ class BookMarketingGenerator:
         model_combo = ttk.Combobox(model_frame, textvariable=self.selected_model, values=GEMINI_MODELS, state="readonly", width=40)
         model_combo.grid(row=0, column=0, sticky="w")
         
+        refresh_check = ttk.Checkbutton(model_frame, text="Force refresh (ignore cached responses)", variable=self.force_refresh)
+        refresh_check.grid(row=0, column=1, sticky="e", padx=(10, 0))
+        
+        bundle_check = ttk.Checkbutton(model_frame, text="Bundle related prompts into fewer requests", variable=self.bundle_prompts)
+        bundle_check.grid(row=1, column=0, columnspan=2, sticky="w", pady=(5, 0))
+        
         # File Selection
         file_frame = ttk.LabelFrame(main_frame, text="Input Files", padding="10")
         file_frame.grid(row=3, column=0, sticky="ew", pady=(0, 10))
@@ -173,20 +501,92 @@ class BookMarketingGenerator:
         self.cancel_btn.pack(side="left")
         
     def log(self, message):
-        self.log_text.configure(state="normal")
+        """Queue a log line. Safe to call from worker threads."""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.log_text.see(tk.END)
-        self.log_text.configure(state="disabled")
+        self._log_queue.put(f"[{timestamp}] {message}\n")
+
+    def _drain_log(self, max_lines=200):
+        """Move queued log lines into the log widget in one insert, then reschedule."""
+        lines = []
+        try:
+            while len(lines) < max_lines:
+                lines.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if lines:
+            self.log_text.configure(state="normal")
+            self.log_text.insert(tk.END, "".join(lines))
+            self.log_text.see(tk.END)
+            self.log_text.configure(state="disabled")
+        self.root.after(100, self._drain_log)
         
-    def call_model(self, model_name, prompt):
+    def prepare_book_model(self, model_name, system_instruction):
+        """Build a model that carries the book text as a fixed system prefix.
+
+        The book is identical across all prompts for a file, so it goes into an
+        explicit context cache when the SDK supports one; otherwise it is set as
+        the system instruction, which Gemini can still cache implicitly. Books
+        under the minimum cacheable size take the second path.
+
+        Returns a (model, cached_content) tuple; either may be None.
+        """
+        if not hasattr(genai, "GenerativeModel"):
+            return None, None
+
+        caching = getattr(genai, "caching", None)
+        if caching is not None and hasattr(genai.GenerativeModel, "from_cached_content"):
+            try:
+                cache = caching.CachedContent.create(
+                    model=model_name,
+                    system_instruction=system_instruction,
+                    ttl=timedelta(hours=1),
+                )
+                return genai.GenerativeModel.from_cached_content(cached_content=cache), cache
+            except Exception as e:
+                self.log(f"  Context cache not used ({e}); sending book as system instruction")
+
+        try:
+            return genai.GenerativeModel(model_name, system_instruction=system_instruction), None
+        except Exception:
+            return None, None
+
+    def call_model(self, model_name, prompt, model=None, on_chunk=None, generation_config=None):
         """Call the installed google.generativeai API in a resilient way.
 
-        Different versions of the library expose different helpers. Try common
-        entry points and normalize the response into a plain string.
+        If `model` is given (see prepare_book_model) it is used directly with
+        `prompt` as the user turn, and the response is streamed: `on_chunk` is
+        called with each piece of text, and the stream is abandoned as soon as
+        cancellation is requested; `generation_config` is passed through (e.g.
+        to request JSON output). Otherwise, different versions of the library
+        expose different helpers; try common entry points and normalize the
+        response into a plain string.
         """
-        # Preferred: module-level convenience function
         try:
+            if model is not None:
+                parts = []
+                response = model.generate_content(prompt, stream=True, generation_config=generation_config)
+                it = iter(response)
+                try:
+                    for chunk in it:
+                        if self.cancel_requested:
+                            raise ModelCallError("Cancelled by user")
+                        try:
+                            text = chunk.text
+                        except ValueError:
+                            # Chunks with no text parts (e.g. a trailing finish-reason chunk)
+                            continue
+                        parts.append(text)
+                        if on_chunk is not None:
+                            on_chunk(text)
+                finally:
+                    # Release the underlying HTTP stream rather than leaving it open
+                    # until garbage collection when we stop early
+                    close = getattr(it, "close", None) or getattr(response, "close", None)
+                    if close is not None:
+                        close()
+                return "".join(parts)
+
+            # Preferred: module-level convenience function
             if hasattr(genai, "generate_text"):
                 resp = genai.generate_text(model=model_name, prompt=prompt)
                 if isinstance(resp, dict):
@@ -200,6 +600,8 @@ class BookMarketingGenerator:
 
             # Older or alternate API shape: a GenerativeModel class
             if hasattr(genai, "GenerativeModel"):
+                # Only reached when prepare_book_model could not build a model, so
+                # this path is rare and not worth caching
                 try:
                     model = genai.GenerativeModel(model_name)
                 except Exception:
@@ -223,22 +625,73 @@ class BookMarketingGenerator:
         except Exception as e:
             raise ModelCallError(str(e))
         
+    async def call_model_async(self, model_name, prompt, model=None, on_chunk=None, generation_config=None):
+        """Async counterpart of call_model.
+
+        Streams through the SDK's native generate_content_async when the
+        per-book model has it; any other API shape runs call_model in a thread.
+        """
+        if model is None or not hasattr(model, "generate_content_async"):
+            return await asyncio.to_thread(self.call_model, model_name, prompt, model, on_chunk, generation_config)
+        try:
+            parts = []
+            response = await model.generate_content_async(prompt, stream=True, generation_config=generation_config)
+            it = response.__aiter__()
+            try:
+                async for chunk in it:
+                    if self.cancel_requested:
+                        raise ModelCallError("Cancelled by user")
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # Chunks with no text parts (e.g. a trailing finish-reason chunk)
+                        continue
+                    parts.append(text)
+                    if on_chunk is not None:
+                        on_chunk(text)
+            finally:
+                # As in call_model: don't leave the stream open after stopping early
+                aclose = getattr(it, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+                else:
+                    close = getattr(it, "close", None) or getattr(response, "close", None)
+                    if close is not None:
+                        close()
+            return "".join(parts)
+        except ModelCallError:
+            raise
+        except Exception as e:
+            raise ModelCallError(str(e))
+
     def select_files(self):
         filetypes = [
             ("Text files", "*.txt"),
+            ("Markdown files", "*.md"),
             ("PDF files", "*.pdf"),
             ("All files", "*.*")
         ]
         files = filedialog.askopenfilenames(title="Select Book Files", filetypes=filetypes)
         if files:
-            for f in files:
-                if f not in self.selected_files:
-                    self.selected_files.append(f)
-                    self.file_listbox.insert(tk.END, Path(f).name)
-            self.log(f"Added {len(files)} file(s)")
+            # Drop unreadable types now rather than after the run has started
+            supported = [f for f in files if Path(f).suffix.lower() in _VALID_SUFFIXES]
+            skipped = len(files) - len(supported)
+            if skipped:
+                self.log(f"Skipped {skipped} unsupported file(s) (use .txt, .md or .pdf)")
+            # Set lookup keeps de-duplication O(1) per file for large selections
+            new = []
+            for f in supported:
+                if f not in self._selected_set:
+                    self._selected_set.add(f)
+                    new.append(f)
+            if new:
+                self.selected_files.extend(new)
+                self.file_listbox.insert(tk.END, *(Path(f).name for f in new))
+            self.log(f"Added {len(new)} file(s)")
             
     def clear_files(self):
         self.selected_files = []
+        self._selected_set.clear()
         self.file_listbox.delete(0, tk.END)
         self.log("Cleared file selection")
         
@@ -288,25 +741,43 @@ class BookMarketingGenerator:
         self.progress_detail.configure(text=detail)
         
     def process_files(self):
+        loop = None
         try:
             if genai is None:
                 self.log("google.generativeai module is not installed.")
                 self.root.after(0, lambda: messagebox.showerror("Error", "Required module 'google.generativeai' is not installed. Install with: pip install google-generative-ai"))
                 return
 
-            # Configure API key if available
+            # Configure API key once per run
             if hasattr(genai, "configure"):
                 try:
                     genai.configure(api_key=self.api_key.get().strip())
                 except Exception:
                     # Some versions use a different configure interface or environment variable; ignore here
                     pass
-            self.log(f"Using model: {self.selected_model.get()}")
+            model_name = self.selected_model.get()
+            max_inflight = MODEL_MAX_WORKERS.get(model_name, DEFAULT_MAX_WORKERS)
+            self.log(f"Using model: {model_name} ({max_inflight} concurrent requests)")
+            self.rate_limiter = RateLimiter(*RATE_LIMITS.get(model_name, DEFAULT_RATE_LIMIT))
+            if self.response_cache is None:
+                try:
+                    self.response_cache = ResponseCache(CACHE_DIR / "responses.sqlite3")
+                except Exception as e:
+                    self.log(f"⚠️ Response cache unavailable: {e}")
+            # Force refresh skips cache reads only; fresh responses still replace the old entries
+            use_cache = self.response_cache is not None
+            refresh = self.force_refresh.get()
+            if self.bundle_prompts.get():
+                bundles = PROMPT_BUNDLES
+            else:
+                bundles = [[idx] for idx in range(len(MARKETING_PROMPTS))]
             
             total_files = len(self.selected_files)
             total_prompts = len(MARKETING_PROMPTS)
             total_ops = total_files * total_prompts
             current_op = 0
+            # One event loop for the whole run; the SDK's async client binds to it
+            loop = asyncio.new_event_loop()
             
             for file_idx, file_path in enumerate(self.selected_files):
                 if self.cancel_requested:
@@ -316,91 +787,86 @@ class BookMarketingGenerator:
                 file_name = Path(file_path).stem
                 self.log(f"Processing file {file_idx + 1}/{total_files}: {file_name}")
                 
-                # Read file content
+                # Read file content; read_book_content already stops at MAX_BOOK_CHARS
                 try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        book_content = f.read()
-                except UnicodeDecodeError:
-                    with open(file_path, "r", encoding="latin-1") as f:
-                        book_content = f.read()
+                    book_content = read_book_content(file_path, MAX_BOOK_CHARS)
                 except Exception as e:
                     self.log(f"Error reading {file_name}: {e}")
                     continue
                 
-                # Process each prompt
-                results = []
-                for prompt_idx, prompt in enumerate(MARKETING_PROMPTS):
-                    if self.cancel_requested:
-                        break
-                        
-                    current_op += 1
-                    self.root.after(0, lambda c=current_op, t=total_ops, d=f"Prompt {prompt_idx + 1}/{total_prompts}": 
-                                   self.update_progress(c, t, d))
-                    
-                    try:
-                        full_prompt = f"""You are a professional book marketing expert. Based on the following book content, please complete this task:
+                # Hash the book once per file; the hash is part of every prompt's cache key
+                content_hash = hashlib.sha256(book_content.encode("utf-8")).digest()
 
-{prompt}
+                # Pick up where a cancelled run left off, unless forcing a refresh
+                output_file = Path(self.output_path.get()) / f"{file_name}_Marketing_Report.md"
+                done = {} if refresh else load_partial_report(output_file, model_name, content_hash)
+                if done:
+                    self.log(f"  Resuming: {len(done)} prompt(s) already in {output_file.name}")
+                results = [(num, MARKETING_PROMPTS[num - 1], text, True) for num, text in sorted(done.items())]
+                current_op += len(results)
+                pending = [[idx for idx in bundle if idx + 1 not in done] for bundle in bundles]
+                pending = [bundle for bundle in pending if bundle]
 
-BOOK CONTENT:
-{book_content[:100000]}  # Limit content to avoid token limits
-"""
+                # Write each finished section as it arrives so a cancelled run keeps
+                # the responses already paid for
+                with open(output_file, "w", encoding="utf-8") as report_file:
+                    report_file.write(report_header(file_name, model_name, content_hash))
+                    for prompt_num, prompt, result, _ok in results:
+                        report_file.write(report_section(prompt_num, prompt, result))
+                    report_file.flush()
+                    saved = len(results)
+
+                    def on_batch(batch):
+                        nonlocal current_op, saved
+                        results.extend(batch)
+                        current_op += len(batch)
+                        # Failed prompts are left out so a resumed run retries them
+                        for prompt_num, prompt, result, ok in batch:
+                            if ok:
+                                report_file.write(report_section(prompt_num, prompt, result))
+                                saved += 1
+                        report_file.flush()
+                        self.root.after(0, lambda c=current_op, t=total_ops, d=f"Prompt {len(results)}/{total_prompts}":
+                                       self.update_progress(c, t, d))
+
+                    # Serve cached responses first so the book is only uploaded when
+                    # some prompt actually has to go to the model
+                    if use_cache and not refresh:
+                        cached, pending = self._load_cached_responses(model_name, pending, content_hash)
+                        if cached:
+                            on_batch(cached)
+
+                    if pending:
+                        # The instructions and book text are the same for every prompt, so send
+                        # them once as a (cached) system prefix and vary only the task
+                        system_instruction = f"{SYSTEM_HEADER}\n\nBOOK CONTENT:\n{book_content}\n"
+                        book_model, cached_content = self.prepare_book_model(model_name, system_instruction)
+
+                        try:
+                            # Process prompts concurrently on the event loop; each one is an independent request
+                            loop.run_until_complete(self._run_bundles(
+                                model_name, pending, system_instruction, book_model,
+                                content_hash if use_cache else None, max_inflight, on_batch))
+                        finally:
+                            if cached_content is not None:
+                                # Don't keep paying for cache storage until the TTL runs out,
+                                # even when the run fails or is cancelled
+                                try:
+                                    cached_content.delete()
+                                except Exception:
+                                    pass
 
-                        # Retry logic for transient errors (e.g., 429 quota errors)
-                        max_retries = 3
-                        delay = 1.0
-                        success = False
-                        result_text = None
-
-                        for attempt in range(1, max_retries + 1):
-                            try:
-                                result_text = self.call_model(self.selected_model.get(), full_prompt)
-                                success = True
-                                break
-                            except ModelCallError as mce:
-                                err_str = str(mce)
-                                # Decide if retrying makes sense: treat quota/429 and transient network errors as retryable
-                                retryable = False
-                                low = err_str.lower()
-                                if "429" in err_str or "resource has been exhausted" in low or "quota" in low or "rate limit" in low or "timeout" in low or "temporar" in low:
-                                    retryable = True
-                                else:
-                                    # For unknown errors, still allow a couple attempts
-                                    retryable = True
-
-                                self.log(f"  ⚠️ Model error on attempt {attempt}/{max_retries}: {err_str}")
-                                if attempt < max_retries and retryable:
-                                    self.log(f"  → Retrying in {delay}s...")
-                                    time.sleep(delay)
-                                    delay *= 2
-                                    continue
-                                else:
-                                    # Final failure after retries: capture the error message
-                                    result_text = f"Error calling model after {attempt} attempt(s): {err_str}"
-                                    success = False
-                                    break
-
-                        if success and result_text:
-                            results.append((prompt_idx + 1, prompt, result_text))
-                            self.log(f"  ✓ Completed prompt {prompt_idx + 1}/{total_prompts}")
-                        else:
-                            results.append((prompt_idx + 1, prompt, result_text or "No response generated."))
-                            self.log(f"  ✗ Failed prompt {prompt_idx + 1}/{total_prompts}: {result_text}")
-
-                    except Exception as e:
-                        error_msg = f"Error: {str(e)}"
-                        results.append((prompt_idx + 1, prompt, error_msg))
-                        self.log(f"  ✗ Error on prompt {prompt_idx + 1}: {e}")
+                if self.cancel_requested:
+                    self.log(f"Partial report saved: {output_file.name} ({saved}/{total_prompts} prompts)")
+                    break
+
+                # Requests finish in any order; rewrite the report in prompt order with failures included
+                results.sort(key=lambda r: r[0])
+                report = self.generate_report(file_name, results, model_name, content_hash)
+                with open(output_file, "w", encoding="utf-8") as f:
+                    f.write(report)
                 
-                if not self.cancel_requested:
-                    # Generate markdown report
-                    report = self.generate_report(file_name, results)
-                    output_file = Path(self.output_path.get()) / f"{file_name}_Marketing_Report.md"
-                    
-                    with open(output_file, "w", encoding="utf-8") as f:
-                        f.write(report)
-                    
-                    self.log(f"✓ Saved report: {output_file.name}")
+                self.log(f"✓ Saved report: {output_file.name}")
             
             if not self.cancel_requested:
                 self.log("=" * 50)
@@ -411,42 +877,212 @@ BOOK CONTENT:
             self.log(f"Fatal error: {e}")
             self.root.after(0, lambda: messagebox.showerror("Error", f"Processing failed: {e}"))
         finally:
+            if loop is not None:
+                loop.close()
             self.is_running = False
             self.root.after(0, self.reset_ui)
-            
-    def reset_ui(self):
-        self.start_btn.configure(state="normal")
-        self.cancel_btn.configure(state="disabled")
-        self.progress_label.configure(text="Ready")
-        self.progress_detail.configure(text="")
-        
-    def generate_report(self, book_name, results):
-        report = f"""# 📚 Gemini Pro Book Marketing Content Report
 
-**Book:** {book_name}  
-**Generated:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}  
-**Model:** {self.selected_model.get()}
+    def _load_cached_responses(self, model_name, bundles, content_hash):
+        """Look up every prompt in `bundles` in the response cache.
 
----
+        Returns (results, remaining): result tuples for the cache hits, and the
+        bundles with those prompts removed (empty bundles are dropped).
+        """
+        total_prompts = len(MARKETING_PROMPTS)
+        results = []
+        remaining = []
+        for bundle in bundles:
+            misses = []
+            for idx in bundle:
+                cached = self.response_cache.get(ResponseCache.make_key(model_name, MARKETING_PROMPTS_BYTES[idx], content_hash))
+                if cached is None:
+                    misses.append(idx)
+                else:
+                    self.log(f"  ✓ Prompt {idx + 1}/{total_prompts} loaded from cache")
+                    results.append((idx + 1, MARKETING_PROMPTS[idx], cached, True))
+            if misses:
+                remaining.append(misses)
+        return results, remaining
 
-"""
-        for prompt_num, prompt, result in results:
-            report += f"""## {prompt_num}. Prompt {prompt_num}
+    async def _run_bundles(self, model_name, bundles, system_instruction, book_model, content_hash, max_inflight, on_batch):
+        """Run all prompt bundles for one book with at most `max_inflight` requests at a time.
 
-**Task:** {prompt}
+        `on_batch` is called with each bundle's results as it finishes.
+        """
+        semaphore = asyncio.Semaphore(max_inflight)
 
-### Response:
+        async def run(bundle):
+            async with semaphore:
+                return await self._run_bundle(model_name, bundle, system_instruction, book_model, content_hash)
 
-{result}
+        for next_done in asyncio.as_completed([run(bundle) for bundle in bundles]):
+            # Prompts skipped because of cancellation are left out
+            batch = await next_done
+            if batch:
+                on_batch(batch)
 
----
+    async def _call_with_retries(self, model_name, request_prompt, book_model, estimated_tokens, label, generation_config=None):
+        """Send one request under the rate limiter, retrying transient failures.
 
-"""
-        report += """## 💡 Note on File Format
+        Returns (success, text), where text is the error message on failure, or
+        None if cancelled before a request could be sent.
+        """
+        # Retry logic for transient errors (e.g., 429 quota errors)
+        max_retries = 3
+        delay = 1.0
+        received = 0
 
-This report is in **Markdown (.md)** format. You can open it with any text editor or word processor. For a formatted Word document, open the file and then use 'File > Save As' to save it as a '.docx' file. The headings, bold text, and lists will be preserved!
-"""
-        return report
+        def on_chunk(text):
+            nonlocal received
+            received += len(text)
+            detail = f"{label.capitalize()}: receiving... ({received} characters)"
+            self.root.after(0, lambda d=detail: self.progress_detail.configure(text=d))
+
+        for attempt in range(1, max_retries + 1):
+            if not await self.rate_limiter.acquire_async(estimated_tokens, lambda: self.cancel_requested):
+                return None
+            received = 0
+            try:
+                return True, await self.call_model_async(model_name, request_prompt, book_model, on_chunk, generation_config)
+            except ModelCallError as mce:
+                err_str = str(mce)
+                # Quota/429 and transient network errors are retryable; unknown
+                # errors still get the same attempt budget
+                retryable = bool(_RETRYABLE_RE.search(err_str)) or attempt < max_retries
+
+                self.log(f"  ⚠️ Model error on {label}, attempt {attempt}/{max_retries}: {err_str}")
+                if attempt < max_retries and retryable and not self.cancel_requested:
+                    # Full jitter: concurrent requests that failed together retry at
+                    # different times instead of stampeding the API again
+                    wait = random.uniform(0, delay)
+                    self.log(f"  → Retrying in {wait:.1f}s...")
+                    await asyncio.sleep(wait)
+                    delay = min(delay * 2, MAX_RETRY_DELAY)
+                    continue
+                # Final failure after retries: capture the error message
+                return False, f"Error calling model after {attempt} attempt(s): {err_str}"
+        return False, None
+
+    async def _run_one_prompt(self, model_name, prompt_idx, prompt, system_instruction, book_model=None, content_hash=None):
+        """Run a single marketing prompt with retries on the processing event loop.
+
+        `book_model` carries `system_instruction` already; without one, the
+        instruction is prepended to the prompt instead.
+
+        When `content_hash` is given, successful responses are stored in the
+        response cache (lookups happen up front in _load_cached_responses).
+
+        Returns a (prompt_num, prompt, result_text, ok) tuple, or None if
+        cancelled before the request was sent.
+        """
+        if self.cancel_requested:
+            return None
+
+        total_prompts = len(MARKETING_PROMPTS)
+        cache_key = None
+        if content_hash is not None:
+            cache_key = ResponseCache.make_key(model_name, MARKETING_PROMPTS_BYTES[prompt_idx], content_hash)
+
+        try:
+            if book_model is not None:
+                request_prompt = prompt
+            else:
+                request_prompt = f"{system_instruction}\nTASK:\n{prompt}"
+
+            # Rough token estimate (~4 chars per token) plus the output budget
+            estimated_tokens = (len(system_instruction) + len(prompt)) // 4 + OUTPUT_TOKEN_BUDGET
+            outcome = await self._call_with_retries(model_name, request_prompt, book_model, estimated_tokens, f"prompt {prompt_idx + 1}")
+            if outcome is None:
+                return None
+            success, result_text = outcome
+
+            if success and result_text:
+                if cache_key is not None:
+                    await asyncio.to_thread(self.response_cache.put, cache_key, result_text)
+                self.log(f"  ✓ Completed prompt {prompt_idx + 1}/{total_prompts}")
+                return (prompt_idx + 1, prompt, result_text, True)
+            self.log(f"  ✗ Failed prompt {prompt_idx + 1}/{total_prompts}: {result_text}")
+            return (prompt_idx + 1, prompt, result_text or "No response generated.", False)
+
+        except Exception as e:
+            self.log(f"  ✗ Error on prompt {prompt_idx + 1}: {e}")
+            return (prompt_idx + 1, prompt, f"Error: {str(e)}", False)
+
+    async def _run_bundle(self, model_name, bundle, system_instruction, book_model=None, content_hash=None):
+        """Run a group of prompt indices as a single JSON-mode request on the event loop.
+
+        The prompts are sent together; any task missing from the reply (or an
+        unparseable reply) falls back to an individual request. Returns a list
+        of result tuples; prompts skipped due to cancellation are omitted.
+        """
+        if len(bundle) == 1:
+            result = await self._run_one_prompt(model_name, bundle[0], MARKETING_PROMPTS[bundle[0]],
+                                          system_instruction, book_model, content_hash)
+            return [result] if result is not None else []
+        if self.cancel_requested:
+            return []
+
+        total_prompts = len(MARKETING_PROMPTS)
+        results = []
+        pending = list(bundle)
+
+        answers = {}
+        if len(pending) > 1:
+            label = "prompts " + ", ".join(str(idx + 1) for idx in pending)
+            tasks = "\n\n".join(f"task_{n}: {MARKETING_PROMPTS[idx]}" for n, idx in enumerate(pending, 1))
+            bundled = BUNDLE_INSTRUCTIONS.format(count=len(pending)) + tasks
+            request_prompt = bundled if book_model is not None else f"{system_instruction}\n{bundled}"
+            estimated_tokens = (len(system_instruction) + len(bundled)) // 4 + OUTPUT_TOKEN_BUDGET * len(pending)
+            try:
+                outcome = await self._call_with_retries(model_name, request_prompt, book_model, estimated_tokens, label,
+                                                  generation_config={"response_mime_type": "application/json"})
+            except Exception as e:
+                outcome = (False, str(e))
+            if outcome is None:
+                return results
+            success, text = outcome
+            parsed = None
+            if success and text:
+                try:
+                    parsed = json.loads(text)
+                except ValueError:
+                    parsed = None
+            if isinstance(parsed, dict):
+                for n, idx in enumerate(pending, 1):
+                    value = parsed.get(f"task_{n}")
+                    if isinstance(value, str) and value.strip():
+                        answers[idx] = value.strip()
+            if len(answers) < len(pending):
+                self.log(f"  ⚠️ Bundled reply incomplete for {label}; sending the rest individually")
+
+        for idx in pending:
+            prompt = MARKETING_PROMPTS[idx]
+            if idx in answers:
+                if content_hash is not None:
+                    await asyncio.to_thread(
+                        self.response_cache.put,
+                        ResponseCache.make_key(model_name, MARKETING_PROMPTS_BYTES[idx], content_hash), answers[idx])
+                self.log(f"  ✓ Completed prompt {idx + 1}/{total_prompts}")
+                results.append((idx + 1, prompt, answers[idx], True))
+            else:
+                result = await self._run_one_prompt(model_name, idx, prompt, system_instruction, book_model, content_hash)
+                if result is not None:
+                    results.append(result)
+        return results
+
+    def reset_ui(self):
+        self.start_btn.configure(state="normal")
+        self.cancel_btn.configure(state="disabled")
+        self.progress_label.configure(text="Ready")
+        self.progress_detail.configure(text="")
+        
+    def generate_report(self, book_name, results, model_name=None, content_hash=None):
+        # Collect sections in a list and join once rather than growing a string
+        parts = [report_header(book_name, model_name or self.selected_model.get(), content_hash)]
+        for prompt_num, prompt, result, _ok in results:
+            parts.append(report_section(prompt_num, prompt, result))
+        parts.append(REPORT_FOOTER)
+        return "".join(parts)
 
 
 def main():
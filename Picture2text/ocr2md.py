@@ -12,25 +12,94 @@ Security Notes:
 """
 
 import os
+import stat
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, scrolledtext
 from pathlib import Path
 import threading
-from typing import Any
+import queue
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Final
 from datetime import datetime
 import re
 import logging
 import webbrowser
 import json
+import hashlib
+import shutil
+import time
+import random
+from collections import deque
+from itertools import islice
+from dataclasses import dataclass
+from io import BytesIO
+
+# BLAKE3 is much faster than SHA-256 for hashing large scans; fall back when absent
+try:
+    from blake3 import blake3 as _cache_hasher  # type: ignore
+except Exception:
+    _cache_hasher = hashlib.sha256
 
-# Import google.generativeai in a way that avoids static attribute errors in editors
+# Optional: Pillow shrinks large photos before upload. Without it files are sent as-is.
 try:
-    import google.generativeai as _genai  # type: ignore
+    from PIL import Image, ImageChops  # type: ignore
 except Exception:
-    _genai = None  # type: ignore
+    Image = None  # type: ignore
+    ImageChops = None  # type: ignore
+
+# Optional: pypdfium2 rasterizes PDFs so their pages can be transcribed in parallel.
+# Without it (or without Pillow) PDFs are sent to Gemini whole. It loads a
+# native library, so _load_pdfium imports it when the first PDF is processed.
+pdfium: Any = None
+
+
+def _load_pdfium() -> Any:
+    """Import pypdfium2 on first call and return it, or None if it isn't installed."""
+    global pdfium
+    if pdfium is None:
+        try:
+            import pypdfium2 as _pdfium  # type: ignore
+        except Exception:
+            return None
+        pdfium = _pdfium
+    return pdfium
+
+# google.generativeai pulls in gRPC, protobuf and the Google API client stack,
+# so it is imported by _load_genai on first use rather than at startup.
+# Typed as Any so type-checkers won't complain about missing attributes.
+genai: Any = None
+# google-api-core ships with google-generativeai and defines the typed API errors
+_gexc: Any = None
 
-# Expose a module-typed name so type-checkers won't complain about missing attributes
-genai: Any = _genai
+# Errors worth retrying: rate limits, overload, timeouts and transient server
+# faults. The API error types are added once google-api-core is loaded.
+_RETRYABLE_ERRORS: tuple[type[BaseException], ...] = (TimeoutError, ConnectionError)
+
+
+def _load_genai() -> Any:
+    """Import google.generativeai on first call and return it, or None if it isn't installed."""
+    global genai, _gexc, _RETRYABLE_ERRORS
+    if genai is None:
+        try:
+            import google.generativeai as _genai  # type: ignore
+        except Exception:
+            return None
+        try:
+            from google.api_core import exceptions as _api_exceptions  # type: ignore
+        except Exception:
+            _api_exceptions = None
+        if _api_exceptions is not None and _gexc is None:
+            _gexc = _api_exceptions
+            _RETRYABLE_ERRORS += (
+                _gexc.ResourceExhausted,
+                _gexc.TooManyRequests,
+                _gexc.ServiceUnavailable,
+                _gexc.DeadlineExceeded,
+                _gexc.InternalServerError,
+            )
+        genai = _genai
+    return genai
 
 GEMINI_MODELS = [
     "gemini-2.5-pro",
@@ -42,24 +111,95 @@ GEMINI_MODELS = [
     "gemini-1.5-flash",
 ]
 
+# Files transcribed in parallel. Each request is network-bound, so threads overlap
+# the round-trips; keep this modest to stay under per-minute API quotas.
+DEFAULT_CONCURRENCY = 4
+MAX_CONCURRENCY = 16
+# How often (ms) the Tk thread drains log/progress updates posted by workers,
+# and the slower rate used while nothing is running or queued
+UI_POLL_MS = 50
+UI_IDLE_POLL_MS = 250
+
+# Files larger than this are sent through the Gemini File API (streamed from disk)
+# instead of being read into memory and inlined in the request
+INLINE_MAX_BYTES = 5 * 1024 * 1024
+# Gemini rejects requests with more inline data than this, so larger files
+# must use the File API rather than being read into memory only to fail
+INLINE_REQUEST_LIMIT = 20 * 1024 * 1024
+
+# Uploaded files can sit in PROCESSING briefly; generate_content fails until ACTIVE
+UPLOAD_POLL_INTERVAL = 1.0
+UPLOAD_PROCESSING_TIMEOUT = 120
+
+# Retry backoff (seconds): full jitter over an exponentially growing window,
+# capped at MAX_RETRY_DELAY, unless the server says how long to wait
+RETRY_BASE_DELAY = 1.0
+MAX_RETRY_DELAY = 60
+
+# Transcriptions are cached on disk by content hash so re-runs skip the API call.
+# Bump the version tag to invalidate old entries if the output format changes.
+CACHE_DIR = Path.home() / ".cache" / "ocr2md"
+CACHE_VERSION = b"ocr2md-v1"
+
+# Images are downscaled to this long edge and re-encoded before sending; OCR
+# accuracy is unaffected but upload size and image tokens drop sharply
+DEFAULT_MAX_IMAGE_DIM = 2048
+DEFAULT_JPEG_QUALITY = 85
+
+# Images whose 64-bit average hashes differ in at most this many bits are
+# duplicate candidates. An 8x8 hash can't tell apart text pages that share a
+# layout, so a candidate only counts as the same picture (a re-saved or
+# re-encoded copy) when no pixel of its DEDUP_VERIFY_SIZE grayscale thumbnail
+# differs by more than DEDUP_PIXEL_TOLERANCE; even a changed word exceeds that
+DEDUP_MAX_DISTANCE = 2
+DEDUP_VERIFY_SIZE = (256, 256)
+DEDUP_PIXEL_TOLERANCE = 16
+
+# PDF pages are rendered at this multiple of 72 dpi before OCR. PDFium is not
+# thread-safe, so all rendering goes through one lock.
+PDF_RENDER_SCALE = 2
+PAGE_SEPARATOR = "\n\n<!-- page {} -->\n\n"
+_PDFIUM_LOCK = threading.Lock()
+
+# Input tokens served from Gemini's context cache are billed at this fraction of
+# the normal input price (unless pricing.json gives a "cached_input" rate)
+CACHED_INPUT_DISCOUNT = 0.25
+
 # Load pricing from external JSON file (allows easy updates without code changes)
 def load_pricing_from_json() -> dict:
-    """Load pricing data from pricing.json file. Falls back to hardcoded defaults if file not found."""
+    """Load pricing data from pricing.json file. Falls back to hardcoded defaults if file not found.
+    
+    Installs the result as MODEL_PRICING, clears costs memoized under the old
+    prices, and returns it as model_name -> (input, cached_input, output).
+    cached_input defaults to input * CACHED_INPUT_DISCOUNT unless pricing.json
+    gives "cached_input".
+    """
+    global MODEL_PRICING
+    MODEL_PRICING = _read_pricing()
+    calculate_cost.cache_clear()
+    return MODEL_PRICING
+
+
+def _read_pricing() -> dict:
     pricing_file = Path(__file__).parent / "pricing.json"
     try:
         if pricing_file.exists():
             with open(pricing_file, "r") as f:
                 data = json.load(f)
-                # Convert nested model pricing to flat (model_name -> (input, output))
+                # Convert nested model pricing to flat (model_name -> (input, cached_input, output))
                 return {
-                    model: (info.get("input", 0.075), info.get("output", 0.30))
+                    model: (
+                        info["input"],
+                        info.get("cached_input", info["input"] * CACHED_INPUT_DISCOUNT),
+                        info["output"],
+                    )
                     for model, info in data.get("models", {}).items()
                     if "input" in info and "output" in info
                 }
     except Exception as e:
-        logger.warning(f"Failed to load pricing.json: {e}. Using hardcoded defaults.")
+        logger.warning("Failed to load pricing.json: %s. Using hardcoded defaults.", e)
     # Fallback hardcoded pricing (current as of Nov 2025)
-    return {
+    fallback = {
         "gemini-2.5-pro": (0.075, 0.30),
         "gemini-2.5-flash": (0.075, 0.30),
         "gemini-2.5-flash-lite": (0.0375, 0.15),
@@ -68,62 +208,93 @@ def load_pricing_from_json() -> dict:
         "gemini-1.5-pro": (0.075, 0.30),
         "gemini-1.5-flash": (0.075, 0.30),
     }
+    return {
+        model: (input_price, input_price * CACHED_INPUT_DISCOUNT, output_price)
+        for model, (input_price, output_price) in fallback.items()
+    }
 
 # Pricing per model (USD per 1M tokens) — loaded from external pricing.json
-MODEL_PRICING = {}  # Will be initialized after logger setup
+MODEL_PRICING = {}  # Filled in by load_pricing_from_json() once calculate_cost exists
 
 # Security: Configure logging to avoid exposing sensitive data
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
-# Initialize pricing after logger is configured
-MODEL_PRICING = load_pricing_from_json()
+# Regexes used per file / per log line, compiled once at import
+_APIKEY_RE = re.compile(rb'[a-zA-Z0-9_-]+')
+_UNSAFE_NAME_RE = re.compile(r'[^a-zA-Z0-9._-]')
+_REDACT_RE = re.compile(r'[a-zA-Z0-9_-]{30,}')
+# Control characters -> space via str.translate (a plain C loop, no regex engine);
+# the whitespace collapse that follows merges the resulting runs
+_CONTROL_CHARS_TABLE = {i: " " for i in (*range(0x20), 0x7f)}
+_WHITESPACE_RE = re.compile(r"\s+")
+_REPEATED_CHAR_RE = re.compile(r"(.)\1{100,}")
+_PROMPT_BLACKLIST_RE = re.compile("|".join(map(re.escape, ["{{", "}}", "${", "<script", "</script>", "```"])))
 
 def is_valid_api_key(key: str) -> bool:
     """Validate API key format (basic check; Google keys are typically 39+ chars, alphanumeric + hyphens)."""
-    if not key or len(key) < 20:
+    # Cheap length check first; Google API keys contain alphanumeric, hyphens, underscores.
+    # fullmatch (unlike '$') also rejects a trailing newline, e.g. from a pasted env var.
+    # isascii() turns away anything else in C, so the rest can match as bytes.
+    if len(key or "") < 20 or not key.isascii():
         return False
-    # Google API keys contain alphanumeric, hyphens, underscores
-    return bool(re.match(r'^[a-zA-Z0-9_-]{20,}$', key))
+    return _APIKEY_RE.fullmatch(key.encode("ascii")) is not None
 
-def validate_file_path(file_path: str, allowed_parent: Any = None) -> bool:
+def validate_file_path(file_path: str | Path, allowed_parent: Any = None, *, lstat: os.stat_result | None = None) -> bool:
     """
     Validate file path to prevent directory traversal attacks.
     - Reject paths with '..'
     - Reject absolute paths (unless they match allowed_parent)
     - Reject symbolic links
+    
+    Pass the file's lstat() result when the caller already has it to skip
+    the symlink syscall; paths are only resolved when allowed_parent is set.
     """
     try:
-        path = Path(file_path)
+        raw = os.fspath(file_path)
         
         # Reject paths containing '..'
-        if '..' in path.parts:
+        if os.altsep:
+            raw_parts = raw.replace(os.altsep, os.sep).split(os.sep)
+        else:
+            raw_parts = raw.split(os.sep)
+        if '..' in raw_parts:
             return False
         
         # Check if file is a symbolic link (potential security issue)
-        if path.is_symlink():
-            logger.warning(f"Rejected symbolic link: {path.name}")
+        is_symlink = stat.S_ISLNK(lstat.st_mode) if lstat is not None else os.path.islink(raw)
+        if is_symlink:
+            logger.warning("Rejected symbolic link: %s", os.path.basename(raw))
             return False
         
         # If allowed_parent is specified, ensure file is within it
-        if allowed_parent:
-            real_path = path.resolve()
-            real_parent = allowed_parent.resolve()
+        if allowed_parent is not None:
+            real_path = os.path.realpath(raw)
+            real_parent = os.path.realpath(allowed_parent)
             try:
-                real_path.relative_to(real_parent)
+                inside = os.path.commonpath([real_path, real_parent]) == real_parent
             except ValueError:
-                logger.warning(f"File outside allowed directory: {path.name}")
+                # Different drives on Windows
+                inside = False
+            if not inside:
+                logger.warning("File outside allowed directory: %s", os.path.basename(raw))
                 return False
         
         return True
     except Exception as e:
-        logger.error(f"Path validation error: {e}")
+        logger.error("Path validation error: %s", e)
         return False
 
 def sanitize_filename(filename: str) -> str:
     """Remove potentially dangerous characters from filename."""
     # Allow only alphanumeric, dots, hyphens, underscores
-    safe_name = re.sub(r'[^a-zA-Z0-9._-]', '_', filename)
+    safe_name = _UNSAFE_NAME_RE.sub('_', filename)
+    # The character whitelist leaves no path separators, so the result is a
+    # single path component that callers can join without re-validating.
+    # Checked explicitly (not with assert, which -O strips) in case the
+    # whitelist is ever widened.
+    if "/" in safe_name or "\\" in safe_name:
+        raise ValueError(f"Unsafe filename: {filename!r}")
     # Limit length to prevent filesystem issues
     return safe_name[:255]
 
@@ -143,16 +314,13 @@ def sanitize_prompt(prompt: str, max_len: int = 512) -> str:
     # Normalize to string and strip
     p = str(prompt).strip()
     # Remove non-printable/control characters
-    p = re.sub(r"[\x00-\x1f\x7f]+", " ", p)
+    p = p.translate(_CONTROL_CHARS_TABLE)
     # Collapse multiple whitespace/newlines to single spaces
-    p = re.sub(r"\s+", " ", p)
+    p = _WHITESPACE_RE.sub(" ", p)
     # Remove simple suspicious sequences that could be used for injection
-    blacklist = ["{{", "}}", "${", "<script", "</script>", "```"]
-    for seq in blacklist:
-        if seq in p:
-            p = p.replace(seq, " ")
+    p = _PROMPT_BLACKLIST_RE.sub(" ", p)
     # Replace extremely long repeated characters
-    p = re.sub(r"(.)\1{100,}", r"\1", p)
+    p = _REPEATED_CHAR_RE.sub(r"\1", p)
     # Truncate to max length
     if len(p) > max_len:
         p = p[:max_len]
@@ -160,11 +328,16 @@ def sanitize_prompt(prompt: str, max_len: int = 512) -> str:
     return p.strip()
 
 
-def calculate_cost(input_tokens: int, output_tokens: int, model: str) -> float:
+@functools.lru_cache(maxsize=1024)
+def calculate_cost(uncached_input_tokens: int, cached_input_tokens: int, output_tokens: int, model: str) -> float:
     """Calculate cost in USD for a single API call based on token usage.
     
+    Memoized: load_pricing_from_json() clears this cache whenever it installs
+    new prices.
+    
     Args:
-        input_tokens: Number of input tokens (prompt + image)
+        uncached_input_tokens: Input tokens (prompt + image) billed at the full rate
+        cached_input_tokens: Input tokens served from the context cache
         output_tokens: Number of output tokens (response)
         model: Model name
     
@@ -172,15 +345,20 @@ def calculate_cost(input_tokens: int, output_tokens: int, model: str) -> float:
         Cost in USD (float)
     """
     if model not in MODEL_PRICING:
-        logger.warning(f"Unknown model for pricing: {model}. Assuming gemini-2.5-flash pricing.")
+        logger.warning("Unknown model for pricing: %s. Assuming gemini-2.5-flash pricing.", model)
         model = "gemini-2.5-flash"
     
-    input_price_per_1m, output_price_per_1m = MODEL_PRICING[model]
+    input_price_per_1m, cached_price_per_1m, output_price_per_1m = MODEL_PRICING[model]
     # Prices are per 1M tokens, so divide by 1,000,000
-    input_cost = (input_tokens / 1_000_000) * input_price_per_1m
+    input_cost = (uncached_input_tokens / 1_000_000) * input_price_per_1m
+    input_cost += (cached_input_tokens / 1_000_000) * cached_price_per_1m
     output_cost = (output_tokens / 1_000_000) * output_price_per_1m
     return input_cost + output_cost
 
+
+# Initialize pricing after the logger and calculate_cost's cache exist
+load_pricing_from_json()
+
 def validate_output_directory(output_dir: str) -> bool:
     """Validate output directory and ensure it can be safely created."""
     try:
@@ -196,86 +374,528 @@ def validate_output_directory(output_dir: str) -> bool:
         test_file.unlink()
         return True
     except Exception as e:
-        logger.error(f"Output directory validation failed: {e}")
+        logger.error("Output directory validation failed: %s", e)
         return False
 
-def get_mime_type(file_path: str, max_size_mb: int = 100) -> str:
-    ext = Path(file_path).suffix.lower()
-    mime_types = {
-        ".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg",
-        ".pdf": "application/pdf", ".webp": "image/webp", ".gif": "image/gif",
-    }
-    if ext not in mime_types:
-        raise ValueError(f"Unsupported file type: {ext}")
+# Supported input extensions (treat as read-only; built once at import)
+_MIME_TYPES: Final[dict[str, str]] = {
+    ".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg",
+    ".pdf": "application/pdf", ".webp": "image/webp", ".gif": "image/gif",
+    ".tif": "image/tiff", ".tiff": "image/tiff", ".bmp": "image/bmp",
+}
+
+# Formats Gemini doesn't accept; Pillow re-encodes them before they are sent
+_CONVERT_MIME_TYPES: Final[frozenset[str]] = frozenset({"image/tiff", "image/bmp"})
+
+# Leading "magic" bytes of the supported formats; the file's real type wins
+# over its extension so misnamed files are sent with the right MIME type
+_SNIFFERS: Final[tuple[tuple[bytes, str], ...]] = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"%PDF-", "application/pdf"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+)
+
+# Bytes read from the start of a file for sniffing
+SNIFF_BYTES = 32
+# DIB header sizes found in real BMP files (BITMAPCOREHEADER .. BITMAPV5HEADER);
+# "BM" alone is too common a prefix to identify one
+_BMP_DIB_SIZES: Final[frozenset[int]] = frozenset({12, 16, 40, 52, 56, 64, 108, 124})
+
+def _sniff_mime(header: bytes) -> str | None:
+    """Identify a supported format from the first bytes of a file, or None if unrecognised."""
+    for magic, mime_type in _SNIFFERS:
+        if header.startswith(magic):
+            return mime_type
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header[:2] == b"BM" and len(header) >= 18 and int.from_bytes(header[14:18], "little") in _BMP_DIB_SIZES:
+        return "image/bmp"
+    return None
+
+@dataclass(slots=True, frozen=True)
+class FileEntry:
+    """A selected input file together with the lstat() and MIME type taken when it was chosen.
     
+    The lstat only backs the checks made while selecting; processing stats
+    the file again. mime is empty when the file hasn't been sniffed yet.
+    """
+    path: str
+    lstat: os.stat_result
+    mime: str = ""
+    
+    @classmethod
+    def from_path(cls, path: str) -> "FileEntry":
+        return cls(path, os.lstat(path))
+    
+    @property
+    def size(self) -> int:
+        return self.lstat.st_size
+    
+    @property
+    def is_link(self) -> bool:
+        return stat.S_ISLNK(self.lstat.st_mode)
+
+
+# Selecting at least this many files from one folder reads the folder once
+# with os.scandir instead of stat'ing each file separately
+SCANDIR_MIN_FILES = 16
+
+def lstat_many(paths: list[str]) -> dict[str, os.stat_result]:
+    """lstat() a batch of paths, grouping by folder so large selections share one directory read.
+    
+    Paths that can't be stat'ed are left out of the result.
+    """
+    by_dir: dict[str, dict[str, str]] = {}
+    for path in paths:
+        by_dir.setdefault(os.path.dirname(path), {})[os.path.basename(path)] = path
+    
+    stats: dict[str, os.stat_result] = {}
+    for parent, wanted in by_dir.items():
+        if len(wanted) >= SCANDIR_MIN_FILES:
+            try:
+                with os.scandir(parent or ".") as it:
+                    for entry in it:
+                        path = wanted.get(entry.name)
+                        if path is not None:
+                            # On Windows this comes from the directory listing itself
+                            stats[path] = entry.stat(follow_symlinks=False)
+            except OSError:
+                pass
+        for path in wanted.values():
+            if path not in stats:
+                try:
+                    stats[path] = os.lstat(path)
+                except OSError:
+                    pass
+    return stats
+
+def check_file_size(file_path: str | Path, size: int, max_size_mb: int = 100) -> None:
+    """Raise ValueError if a file of this size is empty or over max_size_mb."""
     # Security: Validate file size (configurable, prevent DOS)
-    file_size = Path(file_path).stat().st_size
-    max_size = max_size_mb * 1024 * 1024
-    if file_size > max_size:
-        raise ValueError(f"File exceeds maximum size ({max_size_mb} MB): {Path(file_path).name}")
-    if file_size == 0:
-        raise ValueError(f"File is empty: {Path(file_path).name}")
+    if size > max_size_mb * 1024 * 1024:
+        raise ValueError(f"File exceeds maximum size ({max_size_mb} MB): {os.path.basename(file_path)}")
+    if size == 0:
+        raise ValueError(f"File is empty: {os.path.basename(file_path)}")
+
+
+def get_mime_type(file_path: str | Path, max_size_mb: int = 100, size: int | None = None) -> str:
+    """Check a file's type and size and sniff its real format; this reads the file's first bytes.
+    
+    Callers should do this once per file (the GUI does it at selection and
+    keeps the result in FileEntry.mime).
+    """
+    # os.path works on str and Path alike without building a new PurePath
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        mime_type = _MIME_TYPES[ext]
+    except KeyError:
+        raise ValueError(f"Unsupported file type: {ext}") from None
+    
+    check_file_size(file_path, size if size is not None else os.path.getsize(file_path), max_size_mb)
+    
+    with open(file_path, "rb") as f:
+        sniffed = _sniff_mime(f.read(SNIFF_BYTES))
+    if sniffed is not None and sniffed != mime_type:
+        logger.info("%s is %s despite its %s extension", os.path.basename(file_path), sniffed, ext)
+        mime_type = sniffed
+    if mime_type in _CONVERT_MIME_TYPES and Image is None:
+        raise ValueError(f"{os.path.basename(file_path)} needs Pillow to be converted: pip install Pillow")
+    return mime_type
+
+
+@functools.lru_cache(maxsize=1024)
+def _content_hasher(file_path: str, mtime_ns: int, size: int) -> Any:
+    """Hash state after a file's contents, so re-runs in one session don't re-read the file.
     
-    return mime_types[ext]
+    mtime_ns and size are part of the cache key so an edited file is hashed
+    again. Callers must .copy() the result before updating it.
+    """
+    hasher = _cache_hasher()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher
+
+
+def _cache_path(file_path: str, model: str, prompt_text: str, variant: str = "") -> Path:
+    """Return the cache file for this exact (file contents, model, prompt) combination."""
+    # Stat'ed here rather than taken from the caller, so an edit made since
+    # the file was selected misses the digest memo
+    file_stat = os.stat(file_path)
+    hasher = _content_hasher(file_path, file_stat.st_mtime_ns, file_stat.st_size).copy()
+    return _finish_cache_path(hasher, model, prompt_text, variant)
+
+
+def _cache_path_for_bytes(data: bytes, model: str, prompt_text: str, variant: str = "") -> Path:
+    """Like _cache_path, for content that only exists in memory (rendered PDF pages)."""
+    hasher = _cache_hasher()
+    hasher.update(data)
+    return _finish_cache_path(hasher, model, prompt_text, variant)
 
 
-def transcribe_image(file_path: str, api_key: str, model: str = "gemini-2.5-flash", max_size_mb: int = 100, prompt: str | None = None) -> tuple[str, float]:
+def _finish_cache_path(hasher: Any, model: str, prompt_text: str, variant: str) -> Path:
+    hasher.update(model.encode())
+    hasher.update(prompt_text.encode())
+    hasher.update(variant.encode())
+    hasher.update(CACHE_VERSION)
+    key = hasher.hexdigest()
+    return CACHE_DIR / key[:2] / f"{key}.md"
+
+
+def _write_cache(path: Path, text: str) -> None:
+    """Atomically store a transcription; failures only cost a future cache miss."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(path)
+    except OSError as e:
+        logger.warning("Failed to write OCR cache entry: %s", e)
+
+
+def _maybe_downscale(file_path: str, mime_type: str, max_dim: int = DEFAULT_MAX_IMAGE_DIM, quality: int = DEFAULT_JPEG_QUALITY, size: int | None = None) -> tuple[bytes, str] | None:
+    """Shrink an image to max_dim on its long edge and re-encode it.
+    
+    The image is decoded straight from disk, so the original bytes are never
+    held in memory. Images with transparency are re-encoded as PNG,
+    everything else as JPEG. Returns None when the original file should be
+    sent instead: Pillow is missing, the image is animated, already fits in
+    max_dim or can't be decoded, or re-encoding wouldn't make it smaller. Formats in
+    _CONVERT_MIME_TYPES are always re-encoded (first frame only, and
+    without resizing when max_dim is 0), so None means they can't be sent.
+    """
+    convert = mime_type in _CONVERT_MIME_TYPES
+    if Image is None or (max_dim <= 0 and not convert):
+        return None
+    try:
+        with Image.open(file_path) as img:
+            if getattr(img, "is_animated", False) and not convert:
+                return None
+            # Nothing to shrink: send the original rather than trading e.g. a
+            # lossless PNG screenshot of small text for a smaller lossy JPEG
+            if not convert and max(img.size) <= max_dim:
+                return None
+            if max_dim > 0:
+                # Let the JPEG decoder scale by 1/2..1/8 while decoding instead of
+                # materialising the full-resolution bitmap first
+                img.draft("RGB", (max_dim, max_dim))
+                img.thumbnail((max_dim, max_dim), Image.LANCZOS)
+            out = BytesIO()
+            if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+                img.save(out, format="PNG", optimize=True)
+                new_mime = "image/png"
+            else:
+                img.convert("RGB").save(out, format="JPEG", quality=quality, optimize=True)
+                new_mime = "image/jpeg"
+    except Exception as e:
+        logger.warning("Image downscale skipped: %s", e)
+        return None
+    if not convert and out.tell() >= (size if size is not None else os.path.getsize(file_path)):
+        return None
+    return out.getvalue(), new_mime
+
+
+def dedup_thumbnail(file_path: str) -> Any:
+    """Return a DEDUP_VERIFY_SIZE grayscale thumbnail for duplicate checks, or None if unavailable."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(file_path) as img:
+            img.draft("L", DEDUP_VERIFY_SIZE)
+            return img.convert("L").resize(DEDUP_VERIFY_SIZE, Image.LANCZOS)
+    except Exception:
+        return None
+
+
+def average_hash(thumbnail: Any) -> int:
+    """Return a 64-bit average hash of a dedup_thumbnail (8x8 grayscale vs. its mean)."""
+    pixels = list(thumbnail.resize((8, 8), Image.LANCZOS).getdata())
+    mean = sum(pixels) / len(pixels)
+    bits = 0
+    for px in pixels:
+        bits = (bits << 1) | (px > mean)
+    return bits
+
+
+def thumbnails_match(first: Any, second: Any) -> bool:
+    """True if two dedup_thumbnails are the same picture up to compression noise."""
+    return ImageChops.difference(first, second).getextrema()[1] <= DEDUP_PIXEL_TOLERANCE
+
+
+def render_pdf_pages(file_path: str, max_dim: int = DEFAULT_MAX_IMAGE_DIM, quality: int = DEFAULT_JPEG_QUALITY) -> list[bytes]:
+    """Render every page of a PDF to JPEG bytes, in page order."""
+    pages = []
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            for index in range(len(pdf)):
+                page = pdf[index]
+                try:
+                    img = page.render(scale=PDF_RENDER_SCALE).to_pil()
+                finally:
+                    page.close()
+                if max_dim > 0:
+                    img.thumbnail((max_dim, max_dim), Image.LANCZOS)
+                out = BytesIO()
+                img.convert("RGB").save(out, format="JPEG", quality=quality, optimize=True)
+                pages.append(out.getvalue())
+        finally:
+            pdf.close()
+    return pages
+
+
+# Key genai is currently configured with; configure() rebuilds the client's
+# credentials, so repeat calls with the same key are skipped
+_configured_api_key: str | None = None
+
+def _configure_genai(api_key: str) -> None:
+    """Configure genai for api_key unless it already is.
+    
+    The gRPC transport (the SDK default, pinned here) keeps one HTTP/2 channel
+    per client, so every worker using the shared model multiplexes over the
+    same connection instead of each doing its own TLS handshake.
+    """
+    global _configured_api_key
+    if _configured_api_key != api_key:
+        genai.configure(api_key=api_key, transport="grpc")
+        _configured_api_key = api_key
+
+
+def _get_model(api_key: str, model: str) -> Any:
+    """Return a GenerativeModel for (api_key, model), built once and reused across images and runs."""
+    # Outside the cache so switching back to an earlier key reconfigures genai
+    _configure_genai(api_key)
+    return _build_model(api_key, model)
+
+
+@functools.lru_cache(maxsize=8)
+def _build_model(api_key: str, model: str) -> Any:
+    # api_key is only part of the cache key: a model is never shared across keys
+    return genai.GenerativeModel(model)
+
+
+def _inline_payload(file_path: str, mtime_ns: int, size: int, mime_type: str, max_dim: int, quality: int) -> tuple[bytes, str] | None:
+    """Return (bytes, mime_type) to send inline, or None if the file should go through the File API.
+    
+    Only downscaled images are memoized (see _downscaled_payload); plain
+    files are read fresh each time so up to INLINE_MAX_BYTES of raw bytes per
+    file don't stay pinned in memory after the request. mtime_ns and size key
+    that memo, so they must come from a stat taken at call time.
+    """
+    if mime_type.startswith("image/"):
+        # Downscaled photos are small enough to inline even when the original isn't
+        downscaled = _downscaled_payload(file_path, mtime_ns, size, mime_type, max_dim, quality)
+        if downscaled is not None:
+            return downscaled
+        if mime_type in _CONVERT_MIME_TYPES:
+            raise ValueError(f"Could not convert {os.path.basename(file_path)} to a format Gemini accepts")
+    if size > INLINE_MAX_BYTES and hasattr(genai, "upload_file"):
+        return None
+    if size > INLINE_REQUEST_LIMIT:
+        raise ValueError(
+            f"{os.path.basename(file_path)} is too large to send inline and this google-generativeai "
+            "version has no File API; upgrade with: pip install -U google-generativeai"
+        )
+    return Path(file_path).read_bytes(), mime_type
+
+
+@functools.lru_cache(maxsize=16)
+def _downscaled_payload(file_path: str, mtime_ns: int, size: int, mime_type: str, max_dim: int, quality: int) -> tuple[bytes, str] | None:
+    """_maybe_downscale, memoized so retrying a batch doesn't re-encode images.
+    
+    mtime_ns and size are part of the cache key, so an edited file is redone.
+    """
+    return _maybe_downscale(file_path, mime_type, max_dim, quality, size)
+
+
+def _upload(file_path: str, mime_type: str) -> Any:
+    """Upload a file to the Gemini File API and wait until it can be used in a request."""
+    uploaded = genai.upload_file(file_path, mime_type=mime_type)
+    deadline = time.monotonic() + UPLOAD_PROCESSING_TIMEOUT
+    while getattr(getattr(uploaded, "state", None), "name", "ACTIVE") == "PROCESSING":
+        if time.monotonic() > deadline:
+            genai.delete_file(uploaded.name)
+            raise TimeoutError(f"Upload still processing after {UPLOAD_PROCESSING_TIMEOUT}s: {os.path.basename(file_path)}")
+        time.sleep(UPLOAD_POLL_INTERVAL)
+        uploaded = genai.get_file(uploaded.name)
+    if getattr(getattr(uploaded, "state", None), "name", "ACTIVE") == "FAILED":
+        genai.delete_file(uploaded.name)
+        raise RuntimeError(f"File API could not process upload: {os.path.basename(file_path)}")
+    return uploaded
+
+
+def _prompt_text(prompt: str | None) -> str:
+    """Determine prompt text (sanitize defensively), falling back to the default."""
+    prompt_text = sanitize_prompt(prompt) if prompt else "Transcribe this image to Markdown"
+    return prompt_text or "Transcribe this image to Markdown"
+
+
+def transcribe_image(file_path: str, api_key: str, model: str = "gemini-2.5-flash", max_size_mb: int = 100, prompt: str | None = None, use_cache: bool = True, max_dim: int = DEFAULT_MAX_IMAGE_DIM, quality: int = DEFAULT_JPEG_QUALITY, model_instance: Any = None, mime_type: str | None = None) -> tuple[str, float]:
     """Transcribe image to markdown using Google Gemini.
     
+    The caller must have already configured genai for api_key (see _configure_genai).
+    Pass model_instance to reuse a GenerativeModel the caller owns; otherwise
+    one is taken from the module-level cache. Pass mime_type (checked by
+    get_mime_type) to skip sniffing the file again.
+    When use_cache is set, a previous result for identical file bytes, model
+    and prompt is returned from disk at no cost. Images (not PDFs) are
+    downscaled to max_dim px and re-encoded at the given JPEG quality when
+    Pillow is installed; pass max_dim=0 to send them untouched.
+    
     Returns:
         Tuple of (response_text, cost_in_usd)
     """
-    if genai is None:
-        raise RuntimeError("Required package 'google-generativeai' is not installed. Install with: pip install google-generative-ai")
+    if _load_genai() is None:
+        raise RuntimeError("Required package 'google-generative-ai' is not installed. Install with: pip install google-generative-ai")
+
+    # Stat'ed here so the payload memo below is keyed on the file as it is now
+    file_stat = os.stat(file_path)
+    if mime_type is None:
+        mime_type = get_mime_type(file_path, max_size_mb, file_stat.st_size)
+    prompt_text = _prompt_text(prompt)
+    
+    cache_file = None
+    if use_cache:
+        cache_file = _cache_path(file_path, model, prompt_text, f"{max_dim}:{quality}")
+        try:
+            cached_text = cache_file.read_text(encoding="utf-8")
+            logger.info("Cache hit: %s", os.path.basename(file_path))
+            return cached_text, 0.0
+        except OSError:
+            pass
+    
+    uploaded = None
+    payload = _inline_payload(file_path, file_stat.st_mtime_ns, file_stat.st_size, mime_type, max_dim, quality)
+    if payload is not None:
+        file_data, mime_type = payload
+        file_part = {"mime_type": mime_type, "data": file_data}
+    else:
+        # Large files are streamed to the File API rather than held in memory;
+        # the returned handle is reused across retries
+        uploaded = _upload(file_path, mime_type)
+        file_part = uploaded
+    try:
+        text, cost = _generate_with_retries(model_instance or _get_model(api_key, model), model, prompt_text, file_part)
+    finally:
+        if uploaded is not None:
+            # Don't let uploaded files accumulate against the project's storage quota
+            try:
+                genai.delete_file(uploaded.name)
+            except Exception:
+                pass
+    
+    if cache_file is not None:
+        _write_cache(cache_file, text)
+    return text, cost
 
-    # configure if supported
-    if hasattr(genai, "configure"):
+
+def transcribe_pdf(file_path: str, api_key: str, model: str = "gemini-2.5-flash", prompt: str | None = None, use_cache: bool = True, max_dim: int = DEFAULT_MAX_IMAGE_DIM, quality: int = DEFAULT_JPEG_QUALITY, page_workers: int = 1, model_instance: Any = None) -> tuple[str, float]:
+    """Rasterize a PDF and transcribe its pages concurrently (requires pypdfium2 and Pillow).
+    
+    Pages are joined in order, separated by PAGE_SEPARATOR comments.
+    
+    Returns:
+        Tuple of (response_text, cost_in_usd)
+    """
+    if _load_genai() is None:
+        raise RuntimeError("Required package 'google-generative-ai' is not installed. Install with: pip install google-generative-ai")
+    
+    prompt_text = _prompt_text(prompt)
+    pages = render_pdf_pages(file_path, max_dim, quality)
+    model_instance = model_instance or _get_model(api_key, model)
+    # Pages stay on a thread pool rather than an asyncio loop: the SDK keeps one
+    # process-wide async client bound to the first loop it runs on, so per-PDF
+    # loops would reuse a channel tied to another loop. Pages share the caller's
+    # model (and so its client) across pool threads; map() keeps page order
+    with ThreadPoolExecutor(max_workers=max(1, min(page_workers, len(pages)))) as executor:
+        page_results = list(executor.map(
+            lambda page_data: transcribe_page(page_data, api_key, model, prompt_text, use_cache, model_instance),
+            pages,
+        ))
+    
+    parts = []
+    for page_number, (text, _) in enumerate(page_results, start=1):
+        if page_number > 1:
+            parts.append(PAGE_SEPARATOR.format(page_number))
+        parts.append(text)
+    return "".join(parts), sum(cost for _, cost in page_results)
+
+
+def transcribe_page(page_data: bytes, api_key: str, model: str, prompt_text: str, use_cache: bool = True, model_instance: Any = None) -> tuple[str, float]:
+    """Transcribe one rendered PDF page (JPEG bytes); cached per page so partial reruns are free."""
+    cache_file = None
+    if use_cache:
+        cache_file = _cache_path_for_bytes(page_data, model, prompt_text, "page")
         try:
-            genai.configure(api_key=api_key)
-        except Exception:
-            # ignore configure failures (some versions use env vars)
+            return cache_file.read_text(encoding="utf-8"), 0.0
+        except OSError:
             pass
-    with open(file_path, "rb") as f:
-        file_data = f.read()
-    mime_type = get_mime_type(file_path, max_size_mb)
-    model_instance = genai.GenerativeModel(model)
-    # Determine prompt text (sanitize defensively)
-    prompt_text = sanitize_prompt(prompt) if prompt else "Transcribe this image to Markdown"
-    if not prompt_text:
-        prompt_text = "Transcribe this image to Markdown"
-    # Retry logic with exponential backoff for transient errors
+    
+    file_part = {"mime_type": "image/jpeg", "data": page_data}
+    text, cost = _generate_with_retries(model_instance or _get_model(api_key, model), model, prompt_text, file_part)
+    if cache_file is not None:
+        _write_cache(cache_file, text)
+    return text, cost
+
+
+def _retry_delay(attempt: int, error: BaseException) -> float:
+    """Seconds to wait before retrying after `attempt` failed attempts.
+    
+    A server-provided delay (the error's retry_delay, or an HTTP Retry-After
+    header) wins; otherwise "full jitter" spreads parallel workers' retries.
+    """
+    hint = getattr(error, "retry_delay", None)
+    if hint is not None:
+        seconds = hint.total_seconds() if hasattr(hint, "total_seconds") else getattr(hint, "seconds", None)
+        if seconds:
+            return min(MAX_RETRY_DELAY, float(seconds))
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            return min(MAX_RETRY_DELAY, float(headers.get("Retry-After")))
+        except (TypeError, ValueError):
+            pass
+    return random.uniform(0, min(MAX_RETRY_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def _generate_with_retries(model_instance: Any, model: str, prompt_text: str, file_part: Any) -> tuple[str, float]:
+    """Send one generate_content request, retrying transient failures with jittered backoff."""
+    # Retry logic with jittered exponential backoff for transient errors
     max_retries = 3
-    delay = 1.0
     last_error = None
     
     for attempt in range(1, max_retries + 1):
         try:
-            response = model_instance.generate_content([
-                prompt_text,
-                {"mime_type": mime_type, "data": file_data}
-            ])
+            response = model_instance.generate_content([prompt_text, file_part])
             # Extract token usage and calculate cost
             input_tokens = 0
             output_tokens = 0
+            cached_tokens = 0
             if hasattr(response, 'usage_metadata'):
                 input_tokens = getattr(response.usage_metadata, 'prompt_token_count', 0)
                 output_tokens = getattr(response.usage_metadata, 'candidates_token_count', 0)
+                # Implicit context caching reuses a shared prompt prefix across requests
+                cached_tokens = getattr(response.usage_metadata, 'cached_content_token_count', 0) or 0
             
-            cost = calculate_cost(input_tokens, output_tokens, model)
-            logger.info(f"Tokens: {input_tokens} input, {output_tokens} output. Cost: ${cost:.6f}")
+            # prompt_token_count includes the cached part; bill the two classes separately
+            uncached_tokens = max(0, input_tokens - cached_tokens)
+            cost = calculate_cost(uncached_tokens, cached_tokens, output_tokens, model)
+            logger.info("Tokens: %d input + %d cached, %d output. Cost: $%.6f", uncached_tokens, cached_tokens, output_tokens, cost)
             
             return response.text, cost
         except Exception as e:
             last_error = e
-            err_str = str(e).lower()
             # Retry on transient errors (rate limits, timeouts, temporary unavailability)
-            is_retryable = any(x in err_str for x in ["429", "quota", "rate limit", "timeout", "temporarily", "unavailable"])
+            is_retryable = isinstance(e, _RETRYABLE_ERRORS)
             
             if attempt < max_retries and is_retryable:
-                logger.warning(f"Transient error on attempt {attempt}/{max_retries}: {e}. Retrying in {delay}s...")
-                import time
-                time.sleep(delay)
-                delay *= 2  # Exponential backoff
+                sleep_for = _retry_delay(attempt, e)
+                logger.warning("Transient error on attempt %d/%d: %s. Retrying in %.1fs...", attempt, max_retries, e, sleep_for)
+                time.sleep(sleep_for)
             else:
                 raise
     
@@ -283,40 +903,98 @@ def transcribe_image(file_path: str, api_key: str, model: str = "gemini-2.5-flas
     raise last_error or RuntimeError("Max retries exceeded")
 
 
-def process_file(input_path: str, output_dir: str, api_key: str, model: str = "gemini-2.5-flash", max_size_mb: int = 100, prompt: str | None = None) -> tuple[str, float]:
+def write_text_file(path: str | Path, text: str) -> None:
+    """Write text as UTF-8 with a raw os.write, skipping the buffered text layer.
+    
+    Newlines become os.linesep, as with Path.write_text.
+    """
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    data = memoryview(text.encode("utf-8"))
+    # O_BINARY (Windows only) stops the C runtime from translating newlines
+    # itself, which splits the write into small chunks
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        # Normally a single syscall; loop in case the write comes back short
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+
+def process_file(input_path: str | FileEntry, output_dir: str | Path, api_key: str, model: str = "gemini-2.5-flash", max_size_mb: int = 100, prompt: str | None = None, use_cache: bool = True, max_dim: int = DEFAULT_MAX_IMAGE_DIM, quality: int = DEFAULT_JPEG_QUALITY, page_workers: int = 1, model_instance: Any = None, writer: Callable[[Path, str], None] | None = None) -> tuple[str, float]:
     """Process a single file and return output path and cost.
     
+    PDFs are split into pages and transcribed with up to page_workers
+    concurrent requests when pypdfium2 and Pillow are installed. Passing a
+    FileEntry reuses the MIME type sniffed at selection time; the file is
+    always lstat'ed afresh here. A str output_dir is
+    validated on every call; pass a Path that the caller has already run
+    through validate_output_directory to skip that per-file probe. The output
+    is written with write_text_file unless a writer is given (e.g. one that
+    hands it to a dedicated writer thread).
+    
     Returns:
         Tuple of (output_file_path, cost_in_usd)
     """
-    # Security: Validate input file path
-    if not validate_file_path(input_path):
-        raise ValueError(f"Invalid input file path: {Path(input_path).name}")
+    # One lstat taken now (not at selection, since the file may have been
+    # replaced or grown since) serves both the symlink check and the size
+    # check; symlinks are rejected, so it describes the file itself
+    if isinstance(input_path, FileEntry):
+        input_file, mime_type = input_path.path, input_path.mime
+    else:
+        input_file, mime_type = os.fspath(input_path), ""
+    input_stat = os.lstat(input_file)
     
-    input_file = Path(input_path)
+    # Security: Validate input file path
+    if not validate_file_path(input_file, lstat=input_stat):
+        raise ValueError(f"Invalid input file path: {os.path.basename(input_file)}")
     
-    # Security: Validate output directory
-    if not validate_output_directory(output_dir):
+    # Security: Validate output directory (a Path means the caller already did)
+    if isinstance(output_dir, Path):
+        output_path = output_dir
+    elif validate_output_directory(output_dir):
+        output_path = Path(output_dir)
+    else:
         raise ValueError(f"Invalid output directory: {output_dir}")
     
-    output_path = Path(output_dir)
-    
     # Security: Sanitize output filename
-    safe_filename = sanitize_filename(input_file.name)
+    safe_filename = sanitize_filename(os.path.basename(input_file))
+    # The ".txt" suffix also rules out "." and ".." as the final component
     output_file = output_path / f"{safe_filename}.txt"
     
-    # Verify output file is still within output directory (prevent path traversal)
-    if not validate_file_path(str(output_file), output_path):
-        raise ValueError(f"Output file path validation failed")
-    
     # 'prompt' may be provided by the GUI (caller should sanitize). Default preserved when prompt is None
-    markdown_text, cost = transcribe_image(str(input_file), api_key, model, max_size_mb, prompt)
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(markdown_text)
+    if mime_type:
+        # Sniffed at selection; only the size can have changed since
+        check_file_size(input_file, input_stat.st_size, max_size_mb)
+    else:
+        mime_type = get_mime_type(input_file, max_size_mb, input_stat.st_size)
+    if mime_type == "application/pdf" and Image is not None and _load_pdfium() is not None:
+        markdown_text, cost = transcribe_pdf(input_file, api_key, model, prompt, use_cache, max_dim, quality, page_workers, model_instance)
+    else:
+        markdown_text, cost = transcribe_image(input_file, api_key, model, max_size_mb, prompt, use_cache, max_dim, quality, model_instance, mime_type)
+    (writer or write_text_file)(output_file, markdown_text)
     return str(output_file), cost
 
 
 class OCRApp:
+    # Help/About text, built once rather than on every open
+    INSTALL_TEXT = "pip install google-generative-ai"
+    MAC_TEXT = 'export GOOGLE_API_KEY="paste-your-api-key-here"'
+    WIN_TEXT = '$env:GOOGLE_API_KEY = "paste-your-api-key-here"'
+    HELP_TEXT = (
+        "Required package:\n"
+        "If you see: Required package 'google-generativeai' is not installed.\n\n"
+        "Install with:\n"
+        f"    {INSTALL_TEXT}\n\n"
+        "Set your environment API key using one of the following:\n\n"
+        "macOS / Linux:\n"
+        f"    {MAC_TEXT}\n\n"
+        "Windows (PowerShell):\n"
+        f"    {WIN_TEXT}\n"
+    )
+    REPO_URL = "https://github.com/dmburl/python-ai-projects"
+    
     def __init__(self, root):
         self.root = root
         self.root.title("📷 OCR to Markdown")
@@ -324,21 +1002,46 @@ class OCRApp:
         self.root.resizable(True, True)
         self.root.minsize(700, 850)
         
-        self.selected_files = []
+        self.selected_files: list[FileEntry] = []
+        self._selected_paths: set[str] = set()
         # Default to Downloads directory (cross-platform)
         downloads_dir = str(Path.home() / "Downloads")
         self.output_folder = downloads_dir
         self.processing = False
         self.cancel_requested = False
+        # Output directory last checked by validate_inputs; the per-file probe is skipped for it
+        self._validated_output_dir = None
+        # Help/About dialogs are built on first open, then hidden and re-shown
+        self._help_win = None
+        self._about_win = None
         
         self.api_key_var = tk.StringVar(value=os.environ.get("GOOGLE_API_KEY", ""))
         self.selected_model = tk.StringVar(value=GEMINI_MODELS[1])
         self.max_file_size_mb = tk.IntVar(value=100)
+        self.concurrency = tk.IntVar(value=DEFAULT_CONCURRENCY)
+        # Reuse earlier transcriptions of identical files instead of paying again
+        self.use_cache = tk.BooleanVar(value=True)
+        self.max_image_dim = tk.IntVar(value=DEFAULT_MAX_IMAGE_DIM)
+        self.jpeg_quality = tk.IntVar(value=DEFAULT_JPEG_QUALITY)
+        # Opt-in: small thumbnails of different text pages can look alike
+        self.dedupe_images = tk.BooleanVar(value=False)
         # Custom prompt the user can edit; default preserved
         self.custom_prompt_var = tk.StringVar(value="Transcribe this image to Markdown")
         
         # Security notice is shown inline under the API Key field (avoid popup on startup)
 
+        # Log lines, progress and callbacks posted from any thread; drained on
+        # the Tk thread every UI_POLL_MS instead of one Tcl event per update
+        self._ui_queue: deque[tuple] = deque()
+        
+        # One long-lived thread runs batches handed over by start_processing;
+        # None stops it when the window closes. Once _closing is set the Tk
+        # root is gone, so worker threads must not touch it or post to it.
+        self._closing = False
+        self._jobs: queue.Queue = queue.Queue()
+        threading.Thread(target=self._worker_loop, daemon=True).start()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
         self.create_widgets()
     
     def create_widgets(self):
@@ -396,7 +1099,16 @@ class OCRApp:
         model_frame.columnconfigure(0, weight=1)
         
         model_combo = ttk.Combobox(model_frame, textvariable=self.selected_model, values=GEMINI_MODELS, state="readonly", width=30)
-        model_combo.grid(row=0, column=0, sticky="ew")
+        model_combo.grid(row=0, column=0, columnspan=2, sticky="ew")
+        
+        concurrency_label = ttk.Label(model_frame, text="Concurrent requests:")
+        concurrency_label.grid(row=1, column=0, sticky="w", pady=(6, 0))
+        
+        concurrency_spinbox = ttk.Spinbox(model_frame, from_=1, to=MAX_CONCURRENCY, textvariable=self.concurrency, width=6)
+        concurrency_spinbox.grid(row=1, column=1, sticky="e", pady=(6, 0))
+        
+        cache_check = ttk.Checkbutton(model_frame, text="Use cache", variable=self.use_cache)
+        cache_check.grid(row=2, column=0, columnspan=2, sticky="w", pady=(6, 0))
         
         size_frame = ttk.LabelFrame(settings_frame, text="File Size Limit", padding="10")
         size_frame.grid(row=0, column=1, sticky="ew", padx=(5, 0))
@@ -414,6 +1126,24 @@ class OCRApp:
         # Small helper text on the same line as the spinbox (right-aligned)
         size_info = ttk.Label(size_frame, text="(1–500 MB)", font=("Helvetica", 9))
         size_info.grid(row=0, column=2, sticky="e", padx=(10, 0))
+        
+        dim_label = ttk.Label(size_frame, text="Downscale images to (px):")
+        dim_label.grid(row=1, column=0, sticky="w", pady=(6, 0))
+        
+        dim_spinbox = ttk.Spinbox(size_frame, from_=0, to=8192, increment=256, textvariable=self.max_image_dim, width=12)
+        dim_spinbox.grid(row=1, column=1, sticky="e", padx=(10, 0), pady=(6, 0))
+        
+        dim_info = ttk.Label(size_frame, text="(0 = off)", font=("Helvetica", 9))
+        dim_info.grid(row=1, column=2, sticky="e", padx=(10, 0), pady=(6, 0))
+        
+        quality_label = ttk.Label(size_frame, text="JPEG quality:")
+        quality_label.grid(row=2, column=0, sticky="w", pady=(6, 0))
+        
+        quality_spinbox = ttk.Spinbox(size_frame, from_=10, to=100, increment=5, textvariable=self.jpeg_quality, width=12)
+        quality_spinbox.grid(row=2, column=1, sticky="e", padx=(10, 0), pady=(6, 0))
+        
+        quality_info = ttk.Label(size_frame, text="(10–100)", font=("Helvetica", 9))
+        quality_info.grid(row=2, column=2, sticky="e", padx=(10, 0), pady=(6, 0))
 
         # Prompt template (user-editable, sanitized before sending)
         prompt_frame = ttk.LabelFrame(settings_frame, text="Prompt Template", padding="10")
@@ -457,6 +1187,13 @@ class OCRApp:
         scrollbar.grid(row=1, column=1, sticky="ns", pady=(10, 0))
         self.file_listbox.configure(yscrollcommand=scrollbar.set)
         
+        dedupe_check = ttk.Checkbutton(
+            input_frame,
+            text="Deduplicate identical images (re-saved or re-encoded copies; requires Pillow)",
+            variable=self.dedupe_images
+        )
+        dedupe_check.grid(row=2, column=0, columnspan=2, sticky="w", pady=(6, 0))
+        
         # Output Folder Section
         output_frame = ttk.LabelFrame(main_frame, text="Output Directory", padding="10")
         output_frame.grid(row=4, column=0, sticky="ew", pady=(0, 10))
@@ -495,6 +1232,7 @@ class OCRApp:
         
         self.log_text = scrolledtext.ScrolledText(log_frame, height=8, state="disabled", wrap=tk.WORD)
         self.log_text.grid(row=0, column=0, sticky="nsew")
+        self.root.after(UI_POLL_MS, self._drain_ui_queue)
         
         # Control Buttons
         control_frame = ttk.Frame(main_frame)
@@ -507,21 +1245,62 @@ class OCRApp:
         self.cancel_btn.pack(side="left")
     
     def log(self, message):
-        """Log message with automatic sanitization of sensitive data."""
-        # Sanitize: remove API keys, tokens, and sensitive info
-        sanitized = re.sub(r'[a-zA-Z0-9_-]{30,}', '[REDACTED]', message)
-        
-        self.log_text.configure(state="normal")
+        """Log message with automatic sanitization of sensitive data (applied when drained)."""
+        # deque.append is atomic, so worker threads can log without touching Tk
+        if self._closing:
+            return
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {sanitized}\n")
-        self.log_text.see(tk.END)
-        self.log_text.configure(state="disabled")
+        self._ui_queue.append(("log", f"[{timestamp}] {message}\n"))
+    
+    def post_progress(self, current, total, detail=""):
+        """Queue a progress update; only the latest one per drain is drawn."""
+        if self._closing:
+            return
+        self._ui_queue.append(("progress", current, total, detail))
+    
+    def post(self, callback, *args):
+        """Queue callback(*args) to run on the Tk thread after pending log lines."""
+        if self._closing:
+            return
+        self._ui_queue.append(("call", callback, args))
+    
+    def _drain_ui_queue(self):
+        """Apply everything queued since the last tick, then re-arm (more slowly when idle)."""
+        busy = self.processing or bool(self._ui_queue)
+        lines = []
+        progress = None
+        calls = []
+        while self._ui_queue:
+            item = self._ui_queue.popleft()
+            kind = item[0]
+            if kind == "log":
+                lines.append(item[1])
+            elif kind == "progress":
+                progress = item[1:]
+            else:
+                calls.append(item[1:])
+        if lines:
+            # Sanitize: remove API keys, tokens, and sensitive info. One pass over
+            # the whole batch; the pattern can't span the newlines between lines.
+            sanitized = _REDACT_RE.sub('[REDACTED]', "".join(lines))
+            self.log_text.configure(state="normal")
+            self.log_text.insert(tk.END, sanitized)
+            self.log_text.see(tk.END)
+            self.log_text.configure(state="disabled")
+        if progress is not None:
+            self.update_progress(*progress)
+        for callback, args in calls:
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.exception("UI callback failed: %s", e)
+        self.root.after(UI_POLL_MS if busy else UI_IDLE_POLL_MS, self._drain_ui_queue)
     
     def select_files(self):
         files = filedialog.askopenfilenames(
             title="Select Images to OCR",
             filetypes=[
-                ("Supported files", "*.png *.jpg *.jpeg *.pdf *.webp *.gif"),
+                ("Supported files", "*.png *.jpg *.jpeg *.pdf *.webp *.gif *.tif *.tiff *.bmp"),
                 ("PNG files", "*.png"),
                 ("JPEG files", "*.jpg *.jpeg"),
                 ("PDF files", "*.pdf"),
@@ -529,36 +1308,73 @@ class OCRApp:
             ]
         )
         if files:
-            added = 0
-            max_size_mb = self.max_file_size_mb.get()
-            for f in files:
-                # Security: Validate file path
-                if not validate_file_path(f):
-                    self.log(f"⚠️  Rejected file (invalid path): {Path(f).name}")
-                    continue
-                
-                # Security: Validate file size
-                try:
-                    file_size = Path(f).stat().st_size
-                    max_size = max_size_mb * 1024 * 1024
-                    if file_size > max_size:
-                        self.log(f"⚠️  Rejected file (exceeds {max_size_mb}MB): {Path(f).name}")
-                        continue
-                except Exception as e:
-                    self.log(f"⚠️  Could not validate file: {Path(f).name}")
-                    continue
-                
-                if f not in self.selected_files:
-                    self.selected_files.append(f)
-                    self.file_listbox.insert(tk.END, Path(f).name)
-                    added += 1
+            new_files = [f for f in dict.fromkeys(files) if f not in self._selected_paths]
+            # Stat and validate on a worker so large selections don't freeze the window
+            self.file_count_label.config(text=f"Checking {len(new_files)} file(s)...")
+            threading.Thread(
+                target=self._validate_batch,
+                args=(new_files, self.max_file_size_mb.get()),
+                daemon=True
+            ).start()
+    
+    def _validate_batch(self, files, max_size_mb):
+        """Validate newly picked files off the Tk thread, then hand the accepted ones back."""
+        max_size = max_size_mb * 1024 * 1024
+        # Unsupported extensions are turned away before touching the disk
+        supported = []
+        for f in files:
+            if os.path.splitext(f)[1].lower() in _MIME_TYPES:
+                supported.append(f)
+            else:
+                self.log(f"⚠️  Rejected file (unsupported type): {os.path.basename(f)}")
+        files = supported
+        # One lstat per file (batched per folder) feeds the symlink check, the
+        # size check and later processing
+        stats = lstat_many(files)
+        accepted = []
+        for f in files:
+            file_stat = stats.get(f)
+            if file_stat is None:
+                self.log(f"⚠️  Could not validate file: {os.path.basename(f)}")
+                continue
+            
+            # Security: Validate file path
+            if not validate_file_path(f, lstat=file_stat):
+                self.log(f"⚠️  Rejected file (invalid path): {os.path.basename(f)}")
+                continue
+            
+            # Security: Validate file size
+            if file_stat.st_size > max_size:
+                self.log(f"⚠️  Rejected file (exceeds {max_size_mb}MB): {os.path.basename(f)}")
+                continue
             
+            # Sniffed once here; processing reuses it instead of reopening the file
+            try:
+                mime_type = get_mime_type(f, max_size_mb, file_stat.st_size)
+            except (OSError, ValueError) as e:
+                self.log(f"⚠️  Rejected file: {e}")
+                continue
+            
+            accepted.append(FileEntry(f, file_stat, mime_type))
+        self.post(self._apply_validation_results, accepted)
+    
+    def _apply_validation_results(self, entries):
+        """Add validated files to the selection and the listbox in one insert."""
+        # Another selection may have added the same file while this batch was checked
+        entries = [e for e in entries if e.path not in self._selected_paths]
+        self.selected_files.extend(entries)
+        self._selected_paths.update(e.path for e in entries)
+        if entries:
+            self.file_listbox.insert(tk.END, *(os.path.basename(e.path) for e in entries))
+            self.log(f"Added {len(entries)} file(s)")
+        if self.selected_files:
             self.file_count_label.config(text=f"{len(self.selected_files)} file(s) selected")
-            if added > 0:
-                self.log(f"Added {added} file(s)")
+        else:
+            self.file_count_label.config(text="No files selected")
     
     def clear_files(self):
         self.selected_files = []
+        self._selected_paths.clear()
         self.file_listbox.delete(0, tk.END)
         self.file_count_label.config(text="No files selected")
         self.log("Cleared file selection")
@@ -600,9 +1416,9 @@ class OCRApp:
             messagebox.showerror("Error", "Please select at least one image file.")
             return False
         
-        # Security: Validate all selected files
-        for file_path in self.selected_files:
-            if not validate_file_path(file_path):
+        # Security: Validate all selected files as they are now, not as selected
+        for entry in self.selected_files:
+            if not validate_file_path(entry.path):
                 messagebox.showerror("Error", f"Invalid file path detected. Please re-select files.")
                 return False
         
@@ -615,19 +1431,45 @@ class OCRApp:
         if not validate_output_directory(output_dir):
             messagebox.showerror("Error", f"Cannot create or write to output directory. Please check permissions.")
             return False
+        self._validated_output_dir = output_dir
         return True
     
     def start_processing(self):
         if not self.validate_inputs():
             return
+        # First use of the SDK; the window itself never needs it
+        if _load_genai() is not None:
+            try:
+                # Built here so setup errors surface before the worker starts;
+                # process_files gets the same cached model back
+                _get_model(self.get_api_key(), self.selected_model.get())
+            except Exception as e:
+                messagebox.showerror("Error", f"Could not initialise the Gemini client: {e}")
+                return
         self.processing = True
         self.cancel_requested = False
         self.start_btn.configure(state="disabled")
         self.cancel_btn.configure(state="normal")
         self.progress_bar["value"] = 0
         self.log(f"Starting processing with model: {self.selected_model.get()}")
-        thread = threading.Thread(target=self.process_files, daemon=True)
-        thread.start()
+        self._jobs.put(self.process_files)
+    
+    def _worker_loop(self):
+        """Run queued batch jobs one at a time until None arrives."""
+        while True:
+            job = self._jobs.get()
+            if job is None or self._closing:
+                return
+            job()
+    
+    def _on_close(self):
+        # Files not yet started return as soon as a worker picks them up (run()
+        # checks cancel_requested); in-flight requests finish on their own, and
+        # their results only go to the (no longer drained) UI queue
+        self._closing = True
+        self.cancel_requested = True
+        self._jobs.put(None)
+        self.root.destroy()
     
     def cancel_processing(self):
         self.cancel_requested = True
@@ -641,22 +1483,36 @@ class OCRApp:
     
     def process_files(self):
         try:
-            if genai is None:
+            if _load_genai() is None:
                 self.log("ERROR: google.generativeai module is not installed.")
-                self.root.after(0, lambda: messagebox.showerror("Error", "Required module 'google.generativeai' is not installed. Install with: pip install google-generative-ai"))
+                self.post(messagebox.showerror, "Error", "Required module 'google.generativeai' is not installed. Install with: pip install google-generative-ai")
                 return
             
-            if hasattr(genai, "configure"):
-                try:
-                    genai.configure(api_key=self.get_api_key())
-                except Exception:
-                    pass
+            api_key = self.get_api_key()
             
             total_files = len(self.selected_files)
             output_dir = self.output_label.get().strip()
-            api_key = self.get_api_key()
+            # Validated once per batch rather than once per file
+            if output_dir != self._validated_output_dir:
+                if not validate_output_directory(output_dir):
+                    raise ValueError("Cannot create or write to output directory. Please check permissions.")
+                self._validated_output_dir = output_dir
+            output_path = Path(output_dir)
             model = self.selected_model.get()
+            # Built once (normally already in start_processing); every worker shares it
+            model_instance = _get_model(api_key, model)
             max_size_mb = self.max_file_size_mb.get()
+            try:
+                concurrency = min(max(1, self.concurrency.get()), MAX_CONCURRENCY)
+            except tk.TclError:
+                # Spinbox left empty or non-numeric
+                concurrency = DEFAULT_CONCURRENCY
+            use_cache = self.use_cache.get()
+            try:
+                max_dim = max(0, self.max_image_dim.get())
+                quality = min(max(10, self.jpeg_quality.get()), 100)
+            except tk.TclError:
+                max_dim, quality = DEFAULT_MAX_IMAGE_DIM, DEFAULT_JPEG_QUALITY
             # Sanitize prompt once and reuse for all files in this run
             prompt_text = sanitize_prompt(self.custom_prompt_var.get()) or None
             if prompt_text is None:
@@ -666,39 +1522,130 @@ class OCRApp:
             results = []
             errors = []
             total_cost = 0.0
+            completed = 0
             
-            for i, file_path in enumerate(self.selected_files, 1):
+            # Duplicate images reuse the transcription of the first one seen
+            entries = {entry.path: entry for entry in self.selected_files}
+            copies: dict[str, list[str]] = {}
+            pending = list(entries)
+            if self.dedupe_images.get() and Image is not None:
+                seen: list[tuple[int, Any, str]] = []
+                pending = []
+                for file_path in entries:
+                    thumbnail = None
+                    if entries[file_path].mime.startswith("image/"):
+                        thumbnail = dedup_thumbnail(file_path)
+                    if thumbnail is not None:
+                        image_hash = average_hash(thumbnail)
+                        match = next((p for h, t, p in seen
+                                      if (h ^ image_hash).bit_count() <= DEDUP_MAX_DISTANCE and thumbnails_match(t, thumbnail)), None)
+                        if match is not None:
+                            copies.setdefault(match, []).append(file_path)
+                            self.log(f"  {os.path.basename(file_path)} matches {os.path.basename(match)}; its output will be copied")
+                            continue
+                        seen.append((image_hash, thumbnail, file_path))
+                    pending.append(file_path)
+                skipped = total_files - len(pending)
+                if skipped:
+                    self.log(f"Skipping {skipped} duplicate image(s); their output will be copied")
+            
+            # Share the request budget: a lone PDF gets every slot for its pages,
+            # a large batch keeps one request per file
+            page_workers = max(1, concurrency // max(1, min(concurrency, len(pending))))
+            
+            # Outputs are written in order by one thread so transcription workers
+            # don't contend on the output directory
+            write_jobs: queue.Queue = queue.Queue()
+            write_failures: list[tuple[str, str, str]] = []
+            writer_thread = threading.Thread(target=self._writer_loop, args=(write_jobs, write_failures), daemon=True)
+            writer_thread.start()
+            
+            def run(file_path):
+                # Files still queued when Cancel is pressed are skipped
                 if self.cancel_requested:
-                    self.log("Processing cancelled by user.")
-                    break
-                
-                filename = Path(file_path).name
-                self.root.after(0, lambda c=i, t=total_files, d=filename: self.update_progress(c, t, d))
-                self.log(f"Processing ({i}/{total_files}): {filename}")
-                
-                try:
-                    output, cost = process_file(file_path, output_dir, api_key, model, max_size_mb, prompt_text)
-                    results.append(output)
-                    total_cost += cost
-                    self.log(f"  ✓ Completed: {filename} — Cost: ${cost:.6f}")
-                except Exception as e:
-                    errors.append((filename, str(e)))
-                    self.log(f"  ✗ Error: {filename} - {e}")
+                    return None
+                name = os.path.basename(file_path)
+                self.log(f"Processing: {name}")
+                def write(output_file, text):
+                    write_jobs.put((name, str(output_file), write_text_file, (output_file, text)))
+                return process_file(entries[file_path], output_path, api_key, model, max_size_mb, prompt_text, use_cache, max_dim, quality, page_workers, model_instance, write)
             
-            if not self.cancel_requested:
+            try:
+                with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(pending)))) as executor:
+                    # Cancelling is left to run(): queued files return None at once.
+                    # Cancelling the futures here would never wake as_completed.
+                    futures = {executor.submit(run, file_path): file_path for file_path in pending}
+                    for future in as_completed(futures):
+                        filename = os.path.basename(futures[future])
+                        duplicates = copies.get(futures[future], [])
+                        try:
+                            outcome = future.result()
+                        except Exception as e:
+                            completed += 1 + len(duplicates)
+                            errors.append((filename, str(e)))
+                            errors.extend((os.path.basename(dup), f"Duplicate of failed file {filename}") for dup in duplicates)
+                            self.log(f"  ✗ Error: {filename} - {e}")
+                        else:
+                            if outcome is None:
+                                continue
+                            completed += 1
+                            output, cost = outcome
+                            results.append(output)
+                            total_cost += cost
+                            self.log(f"  ✓ Completed ({completed}/{total_files}): {filename} — Cost: ${cost:.6f}")
+                            for dup in duplicates:
+                                completed += 1
+                                dup_name = os.path.basename(dup)
+                                try:
+                                    dup_output = output_path / f"{sanitize_filename(dup_name)}.txt"
+                                except ValueError as e:
+                                    errors.append((dup_name, str(e)))
+                                    self.log(f"  ✗ Error: {dup_name} - {e}")
+                                    continue
+                                # Queued behind the original's write, so the copy sees it
+                                write_jobs.put((dup_name, str(dup_output), shutil.copyfile, (output, dup_output)))
+                                results.append(str(dup_output))
+                                self.log(f"  ↺ Reused ({completed}/{total_files}): {dup_name} — duplicate of {filename}")
+                        self.post_progress(completed, total_files, filename)
+            finally:
+                # Drain pending writes before reporting; failed ones move from
+                # the results to the errors
+                write_jobs.put(None)
+                writer_thread.join()
+            if write_failures:
+                failed = {output for _, output, _ in write_failures}
+                results = [output for output in results if output not in failed]
+                errors.extend((name, error) for name, _, error in write_failures)
+            
+            if self.cancel_requested:
+                self.log("Processing cancelled by user.")
+            else:
                 self.log("=" * 50)
                 self.log(f"Processing complete: {len(results)}/{total_files} files processed")
                 self.log(f"Total cost: ${total_cost:.6f}")
                 if errors:
                     self.log(f"Failed: {len(errors)} file(s)")
-                self.root.after(0, lambda: self.show_complete(len(results), total_files, errors, total_cost))
+                self.post(self.show_complete, len(results), total_files, errors, total_cost)
         
         except Exception as e:
             self.log(f"Fatal error: {e}")
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Processing failed: {e}"))
+            self.post(messagebox.showerror, "Error", f"Processing failed: {e}")
         finally:
             self.processing = False
-            self.root.after(0, self.reset_ui)
+            self.post(self.reset_ui)
+    
+    def _writer_loop(self, jobs, failures):
+        """Run queued (name, output, func, args) writes in order until None arrives."""
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            name, output, func, args = job
+            try:
+                func(*args)
+            except OSError as e:
+                failures.append((name, output, str(e)))
+                self.log(f"  ✗ Error: {name} - {e}")
     
     def reset_ui(self):
         self.start_btn.configure(state="normal")
@@ -710,23 +1657,33 @@ class OCRApp:
         """Security: Clear API key from memory."""
         self.api_key_var.set("")
 
+    def _copy(self, text, what):
+        """Put text on the clipboard and note it in the log."""
+        try:
+            self.root.clipboard_clear()
+            self.root.clipboard_append(text)
+            self.log(f"Copied {what} to clipboard")
+        except Exception:
+            pass
+    
+    def _reshow_dialog(self, top):
+        """Bring back a dialog built earlier; returns False if there is none to show."""
+        if top is None or not top.winfo_exists():
+            return False
+        top.deiconify()
+        top.lift()
+        top.grab_set()
+        return True
+    
+    def _hide_dialog(self, top):
+        """Hide a cached dialog instead of destroying it, releasing its modal grab."""
+        top.grab_release()
+        top.withdraw()
+    
     def show_help(self):
         """Show a help dialog with installation and environment-variable instructions."""
-        install_text = "pip install google-generative-ai"
-        mac_text = 'export GOOGLE_API_KEY="paste-your-api-key-here"'
-        win_text = '$env:GOOGLE_API_KEY = "paste-your-api-key-here"'
-
-        combined = (
-            "Required package:\n"
-            "If you see: Required package 'google-generativeai' is not installed.\n\n"
-            "Install with:\n"
-            f"    {install_text}\n\n"
-            "Set your environment API key using one of the following:\n\n"
-            "macOS / Linux:\n"
-            f"    {mac_text}\n\n"
-            "Windows (PowerShell):\n"
-            f"    {win_text}\n"
-        )
+        if self._reshow_dialog(self._help_win):
+            return
 
         top = tk.Toplevel(self.root)
         top.title("Help & Setup")
@@ -741,7 +1698,7 @@ class OCRApp:
         title.pack(anchor="w")
 
         txt = scrolledtext.ScrolledText(frame, height=12, wrap=tk.WORD, font=("Courier", 10))
-        txt.insert("1.0", combined)
+        txt.insert("1.0", self.HELP_TEXT)
         # Keep the text widget read-only but allow selection/copy via the buttons
         txt.configure(state="disabled")
         txt.pack(fill="both", expand=True, pady=(6, 6))
@@ -749,56 +1706,28 @@ class OCRApp:
         btn_frame = ttk.Frame(frame)
         btn_frame.pack(fill="x")
 
-        def copy_install():
-            try:
-                self.root.clipboard_clear()
-                self.root.clipboard_append(install_text)
-                self.log("Copied install command to clipboard")
-            except Exception:
-                pass
-
-        def copy_mac():
-            try:
-                self.root.clipboard_clear()
-                self.root.clipboard_append(mac_text)
-                self.log("Copied macOS/Linux env command to clipboard")
-            except Exception:
-                pass
-
-        def copy_win():
-            try:
-                self.root.clipboard_clear()
-                self.root.clipboard_append(win_text)
-                self.log("Copied Windows (PowerShell) env command to clipboard")
-            except Exception:
-                pass
-
-        def copy_all():
-            try:
-                self.root.clipboard_clear()
-                self.root.clipboard_append(combined)
-                self.log("Copied help content to clipboard")
-            except Exception:
-                pass
-
-        copy_install_btn = ttk.Button(btn_frame, text="Copy Install", command=copy_install)
+        copy_install_btn = ttk.Button(btn_frame, text="Copy Install", command=lambda: self._copy(self.INSTALL_TEXT, "install command"))
         copy_install_btn.pack(side="left", padx=(0, 6))
 
-        copy_mac_btn = ttk.Button(btn_frame, text="Copy macOS", command=copy_mac)
+        copy_mac_btn = ttk.Button(btn_frame, text="Copy macOS", command=lambda: self._copy(self.MAC_TEXT, "macOS/Linux env command"))
         copy_mac_btn.pack(side="left", padx=(0, 6))
 
-        copy_win_btn = ttk.Button(btn_frame, text="Copy Windows", command=copy_win)
+        copy_win_btn = ttk.Button(btn_frame, text="Copy Windows", command=lambda: self._copy(self.WIN_TEXT, "Windows (PowerShell) env command"))
         copy_win_btn.pack(side="left", padx=(0, 6))
 
-        copy_all_btn = ttk.Button(btn_frame, text="Copy All", command=copy_all)
+        copy_all_btn = ttk.Button(btn_frame, text="Copy All", command=lambda: self._copy(self.HELP_TEXT, "help content"))
         copy_all_btn.pack(side="left", padx=(6, 6))
 
-        close_btn = ttk.Button(btn_frame, text="Close", command=top.destroy)
+        close = functools.partial(self._hide_dialog, top)
+        close_btn = ttk.Button(btn_frame, text="Close", command=close)
         close_btn.pack(side="right")
+        top.protocol("WM_DELETE_WINDOW", close)
+        self._help_win = top
 
     def show_about(self):
         """Show an About dialog with basic app info and a link to the repository."""
-        repo_url = "https://github.com/dmburl/python-ai-projects"
+        if self._reshow_dialog(self._about_win):
+            return
 
         top = tk.Toplevel(self.root)
         top.title("About")
@@ -818,12 +1747,12 @@ class OCRApp:
         desc = ttk.Label(frame, text="A small GUI to transcribe images/PDFs to Markdown using Google Gemini.", wraplength=440)
         desc.pack(anchor="w", pady=(0, 8))
 
-        link_label = ttk.Label(frame, text=repo_url, foreground="blue", cursor="hand2")
+        link_label = ttk.Label(frame, text=self.REPO_URL, foreground="blue", cursor="hand2")
         link_label.pack(anchor="w")
 
         def open_repo(event=None):
             try:
-                webbrowser.open(repo_url)
+                webbrowser.open(self.REPO_URL)
             except Exception:
                 pass
 
@@ -832,29 +1761,24 @@ class OCRApp:
         btn_frame = ttk.Frame(frame)
         btn_frame.pack(fill="x", pady=(10, 0))
 
-        def copy_repo():
-            try:
-                self.root.clipboard_clear()
-                self.root.clipboard_append(repo_url)
-                self.log("Copied repository URL to clipboard")
-            except Exception:
-                pass
-
-        copy_btn = ttk.Button(btn_frame, text="Copy Repo URL", command=copy_repo)
+        copy_btn = ttk.Button(btn_frame, text="Copy Repo URL", command=lambda: self._copy(self.REPO_URL, "repository URL"))
         copy_btn.pack(side="left")
 
         open_btn = ttk.Button(btn_frame, text="Open in Browser", command=open_repo)
         open_btn.pack(side="left", padx=(6, 0))
 
-        close_btn = ttk.Button(btn_frame, text="Close", command=top.destroy)
+        close = functools.partial(self._hide_dialog, top)
+        close_btn = ttk.Button(btn_frame, text="Close", command=close)
         close_btn.pack(side="right")
+        top.protocol("WM_DELETE_WINDOW", close)
+        self._about_win = top
     
     def show_complete(self, success, total, errors, total_cost=0.0):
         msg = f"Successfully processed {success}/{total} files.\n\nOutput folder:\n{self.output_label.get()}"
         msg += f"\n\nTotal cost: ${total_cost:.6f}"
         if errors:
             msg += f"\n\nFailed ({len(errors)}):\n"
-            msg += "\n".join([f"• {name}: {err}" for name, err in errors[:5]])
+            msg += "\n".join(f"• {name}: {err}" for name, err in islice(errors, 5))
             if len(errors) > 5:
                 msg += f"\n...and {len(errors) - 5} more"
         